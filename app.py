@@ -1,38 +1,290 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, abort, request, jsonify
 from flask_cors import CORS
 from sklearn.linear_model import LinearRegression
 import numpy as np
+import pandas as pd
+import copy
+import json
+import os
+import time
+
+from model_registry import ModelRegistry
+from online_regression import IncrementalLinearRegression
+from shared_coefficients import SharedCoefficients
 
 app = Flask(__name__)
 CORS(app)
 
-# Global model (will be trained dynamically)
-model = None
+# Rows per chunk when streaming batch predictions back
+BATCH_CHUNK = 65536
+
+# Rows per chunk when a CSV upload is folded into the model
+CSV_CHUNK_ROWS = 262144
+
+# Trained models, by name and version; saved under MODEL_DIR so a restart keeps them
+MODEL_DIR = os.environ.get('MODEL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models'))
+DEFAULT_MODEL = 'default'
+# Under serve.py every worker process maps the same coefficient file, so a model trained
+# by one worker is the one all of them predict with
+SHARED_COEFFICIENTS = os.environ.get('SHARED_COEFFICIENTS')
+shared = SharedCoefficients(SHARED_COEFFICIENTS) if SHARED_COEFFICIENTS else None
+registry = ModelRegistry(MODEL_DIR, shared=shared)
+
+def requested_model(data=None):
+    """(name, version) from the JSON body or the query string (?model=...&version=...)"""
+    data = data if isinstance(data, dict) else {}
+    name = data.get('model') or request.args.get('model') or DEFAULT_MODEL
+    version = data.get('version') or request.args.get('version')
+    try:
+        return name, int(version) if version is not None else None
+    except ValueError:
+        abort(Response(json.dumps({'error': f'Invalid version {version!r}'}), 400, mimetype='application/json'))
+
+def model_features(name, version):
+    """Number of features of a model, or None if it is not trained"""
+    if shared is not None and version is None:
+        n = shared.n_features(name)
+        if n is not None:
+            return n
+    entry = registry.get(name, version)
+    return entry.model.n_features_in_ if entry is not None else None
+
+def predict_rows(name, version, X):
+    """Predictions of a model for the rows of X, or None if it is not trained"""
+    if shared is not None and version is None:
+        # straight from the shared coefficients: nothing to unpickle or copy per worker
+        result = shared.predict(name, X)
+        if result is not None:
+            return result[1]
+    entry = registry.get(name, version)
+    return entry.model.predict(X) if entry is not None else None
+
+def append_rows(model, chunks):
+    """A copy of an incremental model with the (X, y) chunks added (a new one if model is None)"""
+    if model is None:
+        model = IncrementalLinearRegression()
+    elif not isinstance(model, IncrementalLinearRegression):
+        raise ValueError('This model was trained with "mode": "refit" and keeps no running statistics; '
+                         'use another model name for incremental training')
+    else:
+        model = copy.deepcopy(model)
+    rows = 0
+    for X, y in chunks:
+        model.partial_fit(X, y)
+        rows += len(y)
+    # an empty body would publish an untrained (or unchanged) model as the latest version
+    if not rows:
+        raise ValueError('No training rows in the body')
+    return model
+
+def read_body_into(nbytes):
+    """The next nbytes of the request body, read straight into a NumPy buffer"""
+    buffer = np.empty(nbytes, dtype=np.uint8)
+    view = memoryview(buffer)
+    filled = 0
+    while filled < nbytes:
+        n = request.stream.readinto(view[filled:])
+        if not n:
+            raise ValueError(f'body ended after {filled} of {nbytes} bytes')
+        filled += n
+    return buffer
+
+def read_table():
+    """Training rows of a binary /train body: one float64 array, features then target per row
+
+    application/x-npy         a 2-D .npy array
+    application/octet-stream  raw little-endian float64, ?features=d columns plus the target
+    Both are read into one buffer that the returned array views; nothing is parsed per value.
+    """
+    if request.mimetype == 'application/x-npy':
+        version = np.lib.format.read_magic(request.stream)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(request.stream)
+        if len(shape) != 2 or shape[1] < 2:
+            raise ValueError(f'.npy array must be rows × (features + target), not {shape}')
+        # the shape comes from the client: check it against the body before allocating for it
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        if request.content_length is None:
+            raise ValueError('.npy bodies need a Content-Length')
+        if nbytes != request.content_length - request.stream.tell():
+            raise ValueError(f'.npy header describes {nbytes} bytes of data, '
+                             f'the body has {request.content_length - request.stream.tell()}')
+        buffer = read_body_into(nbytes)
+        table = buffer.view(dtype).reshape(shape, order='F' if fortran_order else 'C')
+        return table.astype(np.float64, copy=False)
+
+    features = request.args.get('features', '1')
+    if not features.isdecimal() or int(features) < 1:
+        raise ValueError(f'features must be a whole number of at least 1, not {features!r}')
+    columns = int(features) + 1
+    if request.content_length is not None:
+        buffer = read_body_into(request.content_length)
+    else:
+        buffer = np.frombuffer(request.get_data(cache=False), dtype=np.uint8)
+    if len(buffer) % (8 * columns):
+        raise ValueError(f'binary body must be whole rows of {columns} float64 values')
+    return buffer.view('<f8').reshape(-1, columns)
+
+def csv_chunks(target=None):
+    """(X, y) chunks of a CSV body with a header row, like data.csv; the target is the last column by default"""
+    for chunk in pd.read_csv(request.stream, chunksize=CSV_CHUNK_ROWS, dtype=np.float64):
+        column = target or chunk.columns[-1]
+        yield chunk.drop(columns=column).to_numpy(), chunk[column].to_numpy()
+
+def training_chunks(data):
+    """(X, y) chunks of a /train body in any of its formats"""
+    if request.mimetype in ('application/x-npy', 'application/octet-stream'):
+        table = read_table()
+        yield table[:, :-1], table[:, -1]
+    elif request.mimetype == 'text/csv':
+        yield from csv_chunks(request.args.get('target'))
+    else:
+        # Get training data from request (one feature per column; a flat list is one feature)
+        X = np.array(data['X'], dtype=np.float64)
+        yield X.reshape(-1, 1) if X.ndim == 1 else X, np.array(data['y'])
+
+def timed(chunks, stats):
+    """Pass chunks through, counting their rows and the time spent decoding them"""
+    chunks = iter(chunks)
+    while True:
+        started = time.perf_counter()
+        chunk = next(chunks, None)
+        stats['parse_seconds'] += time.perf_counter() - started
+        if chunk is None:
+            return
+        stats['rows'] += len(chunk[1])
+        yield chunk
 
 @app.route('/train', methods=['POST'])
 def train():
-    global model
-    data = request.get_json()
+    # JSON bodies carry the data and options; CSV and binary uploads take options
+    # from the query string (?model=...&mode=...&features=...&target=...)
+    started = time.perf_counter()
+    data = request.get_json() if request.mimetype == 'application/json' else None
+    stats = {'parse_seconds': time.perf_counter() - started, 'rows': 0}
+    options = data if isinstance(data, dict) else request.args
+    name, _ = requested_model(data)
+    mode = options.get('mode', 'refit')
+    chunks = timed(training_chunks(data), stats)
 
-    # Get training data from request
-    X = np.array(data['X']).reshape(-1, 1)
-    y = np.array(data['y'])
+    # "mode": "refit" (default) fits the uploaded rows alone; "incremental" adds them to the
+    # rows the model has already seen, updating its running statistics instead of refitting.
+    # A CSV upload is folded in chunk by chunk, so it is never held in memory whole
+    try:
+        if mode == 'incremental':
+            entry = registry.update(name, lambda model: append_rows(model, chunks))
+        elif mode == 'refit' and request.mimetype == 'text/csv':
+            entry = registry.publish(name, append_rows(None, chunks))
+        elif mode == 'refit':
+            X, y = next(chunks)
+            # Train the model and swap it in; requests already predicting finish on the previous version
+            entry = registry.publish(name, LinearRegression().fit(X, y))
+        else:
+            return jsonify({'error': f'Unknown mode {mode!r}: use "refit" or "incremental"'}), 400
+    except (ValueError, TypeError, KeyError) as exc:
+        return jsonify({'error': str(exc)}), 400
 
-    # Train the model
-    model = LinearRegression().fit(X, y)
-
-    return jsonify({'message': 'Model trained successfully!'})
+    return jsonify({'message': 'Model trained successfully!', 'model': entry.name, 'version': entry.version,
+                    'rows': int(getattr(entry.model, 'n_samples_seen_', stats['rows'])),
+                    'parse_ms': round(stats['parse_seconds'] * 1000, 3)})
 
 @app.route('/predict', methods=['POST'])
 def predict():
-    global model
-    if model is None:
+    data = request.get_json()
+    name, version = requested_model(data)
+    n_features = model_features(name, version)
+    if n_features is None:
         return jsonify({'error': 'Model not trained yet!'}), 400
 
+    # "hours" is one number, or a list of feature values for a multi-feature model
+    try:
+        X = np.asarray(data['hours'], dtype=np.float64).reshape(1, -1)
+    except (ValueError, TypeError, KeyError) as exc:
+        return jsonify({'error': f'Bad input: {exc}'}), 400
+    if X.shape[1] != n_features:
+        return jsonify({'error': f'Expected {n_features} feature values, got {X.shape[1]}'}), 400
+    try:
+        # a /train in between may have published a version with other features
+        prediction = predict_rows(name, version, X)
+        if prediction is None:
+            return jsonify({'error': 'Model not trained yet!'}), 400
+        marks = round(float(prediction[0]), 2)
+    except (ValueError, TypeError) as exc:
+        return jsonify({'error': f'Cannot predict: {exc}'}), 400
+
+    return jsonify({'predicted_marks': marks})
+
+@app.route('/models', methods=['GET'])
+def models():
+    loaded = {(name, version): nbytes for name, version, nbytes in registry.loaded()}
+    return jsonify({'models': [
+        {'model': name, 'version': version, 'loaded': (name, version) in loaded}
+        for name, version in sorted(registry.names().items())
+    ]})
+
+def ndjson_lines(stream, block_size=1 << 20):
+    """Lines of a request stream, read in blocks rather than a readline per line"""
+    pending = b''
+    for block in iter(lambda: stream.read(block_size), b''):
+        lines = (pending + block).split(b'\n')
+        pending = lines.pop()
+        yield from lines
+    yield pending
+
+def read_batch():
+    """Feature values of a /predict/batch body as one flat float64 array
+
+    application/json          {"hours": [...]} or a bare [...]
+    application/x-ndjson      one number or array of numbers per line
+    application/octet-stream  raw little-endian float64 values
+    """
+    if request.mimetype == 'application/octet-stream':
+        body = request.get_data(cache=False)
+        if len(body) % 8:
+            raise ValueError('binary body must be a whole number of float64 values')
+        # A view over the request bytes, no per-value parsing or copy
+        return np.frombuffer(body, dtype='<f8')
+    if request.mimetype == 'application/x-ndjson':
+        parts = [np.asarray(json.loads(line), dtype=np.float64).ravel()
+                 for line in ndjson_lines(request.stream) if line.strip()]
+        return np.concatenate(parts) if parts else np.empty(0)
     data = request.get_json()
-    hours = float(data['hours'])
-    prediction = model.predict(np.array([[hours]]))
-    return jsonify({'predicted_marks': round(prediction[0], 2)})
+    return np.asarray(data['hours'] if isinstance(data, dict) else data, dtype=np.float64).ravel()
+
+def stream_predictions(predictions, mimetype):
+    """Yield the response body in chunks of BATCH_CHUNK predictions"""
+    chunks = (predictions[i:i + BATCH_CHUNK] for i in range(0, len(predictions), BATCH_CHUNK))
+    if mimetype == 'application/octet-stream':
+        for chunk in chunks:
+            yield chunk.astype('<f8', copy=False).tobytes()
+    elif mimetype == 'application/x-ndjson':
+        for chunk in chunks:
+            yield json.dumps(chunk.tolist()) + '\n'
+    else:
+        yield '{"predicted_marks": ['
+        for i, chunk in enumerate(chunks):
+            yield (',' if i else '') + json.dumps(chunk.tolist())[1:-1]
+        yield ']}'
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    # JSON bodies may name the model like /predict; other formats use ?model=
+    data = request.get_json(silent=True) if request.mimetype == 'application/json' else None
+    name, version = requested_model(data)
+    n_features = model_features(name, version)
+    if n_features is None:
+        return jsonify({'error': 'Model not trained yet!'}), 400
+
+    try:
+        X = read_batch().reshape(-1, n_features)
+        # One vectorized call for the whole batch, rounded like /predict;
+        # the response is in the same format as the request
+        predictions = np.round(predict_rows(name, version, X), 2) if len(X) else np.empty(0)
+    except (ValueError, TypeError, KeyError) as exc:
+        return jsonify({'error': f'Bad batch: {exc}'}), 400
+    mimetype = request.mimetype if request.mimetype in ('application/octet-stream', 'application/x-ndjson') \
+        else 'application/json'
+    return Response(stream_predictions(predictions, mimetype), mimetype=mimetype)
 
 if __name__ == '__main__':
     app.run(debug=True)
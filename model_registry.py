@@ -0,0 +1,189 @@
+import itertools
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:     # Windows: no cross-process lock, single-process serving only
+    fcntl = None
+
+# Named, versioned models for app.py.
+#
+# Every publish writes <folder>/<name>/v<version>.pkl and then swaps the
+# model in, so a request that is predicting keeps the version it started
+# with and the next one sees the new version. Lookups take no lock: the
+# table of loaded models is replaced as a whole (copy on write) whenever it
+# changes. When the loaded models outgrow the memory budget, the least
+# recently used ones are dropped from memory; they stay on disk and are
+# loaded again on their next use, also after a restart.
+#
+# With several worker processes (serve.py), publishing a version is
+# serialized by a file lock per model, and the latest version of a model
+# comes from a shared_coefficients.SharedCoefficients table, so a model
+# trained in one process is the one every other process predicts with.
+
+MEMORY_BUDGET = 256 * 1024 ** 2   # bytes of loaded models (as pickled)
+KEEP_VERSIONS = 3                 # versions of each model kept on disk
+NAME = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$')
+VERSION_FILE = re.compile(r'^v(\d+)\.pkl$')
+
+ModelVersion = namedtuple('ModelVersion', 'name version model nbytes created')
+
+
+class ModelRegistry:
+    """Thread-safe store of named, versioned models with hot swap and LRU eviction"""
+
+    def __init__(self, folder, memory_budget=MEMORY_BUDGET, keep_versions=KEEP_VERSIONS, shared=None):
+        self.folder = folder
+        self.shared = shared
+        self.memory_budget = memory_budget
+        self.keep_versions = keep_versions
+        self._lock = threading.Lock()
+        self._loaded = {}     # (name, version) → ModelVersion; replaced, never mutated
+        self._used = {}       # (name, version) → tick of last use
+        self._tick = itertools.count()
+        self._writers = {}    # name → lock serializing publishes of that model
+        os.makedirs(folder, exist_ok=True)
+        # latest version of every model on disk; loaded lazily on first use
+        self._latest = self._scan()
+
+    def _scan(self):
+        return {name: versions[-1] for name in os.listdir(self.folder)
+                if NAME.match(name) and (versions := self._versions(name))}
+
+    def _path(self, name, version):
+        return os.path.join(self.folder, name, f'v{version:06d}.pkl')
+
+    def _versions(self, name):
+        folder = os.path.join(self.folder, name)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(int(m.group(1)) for f in os.listdir(folder) if (m := VERSION_FILE.match(f)))
+
+    def names(self):
+        """{name: latest version} of every model, loaded or not"""
+        if self.shared is not None:
+            self._latest.update(self._scan())    # other processes may have added models
+        return dict(self._latest)
+
+    def loaded(self):
+        """[(name, version, nbytes)] of the models in memory"""
+        return [(v.name, v.version, v.nbytes) for v in self._loaded.values()]
+
+    def get(self, name, version=None):
+        """ModelVersion of a model (the latest unless version is given), or None"""
+        if version is None:
+            version = self.shared.version(name) if self.shared is not None else None
+            version = version or self._latest.get(name)
+            if version is None:
+                return None
+        key = (name, version)
+        entry = self._loaded.get(key)
+        if entry is None:
+            entry = self._load(name, version)
+        if entry is not None:
+            self._used[key] = next(self._tick)
+        return entry
+
+    def _load(self, name, version):
+        if not NAME.match(name):
+            return None
+        with self._lock:
+            entry = self._loaded.get((name, version))
+            if entry is not None:
+                return entry
+            try:
+                with open(self._path(name, version), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                return None
+            stat = os.stat(self._path(name, version))
+            entry = ModelVersion(name, version, pickle.loads(data), len(data), stat.st_mtime)
+            self._insert(entry)
+            return entry
+
+    @contextmanager
+    def _writing(self, name):
+        """Serialize publishes of one model across threads and processes"""
+        if not NAME.match(name):
+            raise ValueError(f'Invalid model name {name!r}: use letters, digits, "_", "-" and "."')
+        with self._lock:
+            writer = self._writers.setdefault(name, threading.Lock())
+        with writer:
+            os.makedirs(os.path.join(self.folder, name), exist_ok=True)
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.folder, name, '.lock'), 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def publish(self, name, model):
+        """Save model as the next version of name and make it the one get(name) returns"""
+        with self._writing(name):
+            return self._publish(name, model)
+
+    def update(self, name, change):
+        """Publish change(latest model, or None) as the next version of name
+
+        Updates of one model run one at a time, so none is lost; change
+        must return a new object rather than modify the published one,
+        which other threads may be predicting with.
+        """
+        with self._writing(name):
+            versions = self._versions(name)
+            current = self.get(name, versions[-1]) if versions else None
+            return self._publish(name, change(current.model if current else None))
+
+    def _publish(self, name, model):
+        shared = self.shared is not None and hasattr(model, 'coef_')
+        if shared:
+            # a model the shared table cannot hold is refused before anything is saved,
+            # rather than served by this process alone
+            self.shared.check(name, model.coef_, model.intercept_)
+        data = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+        versions = self._versions(name)
+        version = (versions[-1] if versions else 0) + 1
+        path = self._path(name, version)
+        # write then rename, so a crash never leaves a half-written version
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        entry = ModelVersion(name, version, model, len(data), time.time())
+        with self._lock:
+            self._insert(entry)
+            self._latest[name] = version
+        if shared:
+            self.shared.publish(name, version, model.coef_, model.intercept_)
+        for old in versions[:max(0, len(versions) + 1 - self.keep_versions)]:
+            try:
+                os.remove(self._path(name, old))
+            except FileNotFoundError:
+                pass
+        return entry
+
+    def _insert(self, entry):
+        """Add a loaded model and evict least recently used ones over budget (lock held)"""
+        key = (entry.name, entry.version)
+        loaded = dict(self._loaded)
+        loaded[key] = entry
+        self._used[key] = next(self._tick)
+        total = sum(v.nbytes for v in loaded.values())
+        for victim in sorted(loaded, key=lambda k: self._used.get(k, -1)):
+            if total <= self.memory_budget:
+                break
+            if victim == key:
+                continue
+            total -= loaded.pop(victim).nbytes
+            self._used.pop(victim, None)
+        self._loaded = loaded
@@ -0,0 +1,127 @@
+import time
+
+import numpy as np
+
+# Linear regression from running sufficient statistics.
+#
+# The model keeps the row count, the means of every feature and the target,
+# and their centered cross-products (co-moments). A chunk of new rows is
+# folded in with the pairwise update of Chan et al., so appending k rows
+# costs O(k·d²) and refreshing the coefficients solves one d×d system;
+# nothing depends on the rows seen before. Centering keeps the statistics
+# accurate for large, offset values (prices, square feet) where raw sums of
+# squares would lose precision.
+#
+#   python online_regression.py          # chunked updates vs a full refit
+
+
+class IncrementalLinearRegression:
+    """LinearRegression (with intercept) that can be updated with partial_fit
+
+    fit() and any sequence of partial_fit() calls over the same rows give
+    the same coefficients as sklearn's LinearRegression().fit, up to
+    floating point; collinear features get the minimum-norm solution, as
+    there.
+    """
+
+    def __init__(self):
+        self.n_samples_seen_ = 0
+        self.n_features_in_ = None
+        self.mean_ = None       # means of [features..., target]
+        self.comoment_ = None   # Σ (z - mean)(z - mean)ᵀ over the rows seen, z = [x, y]
+        self.coef_ = None
+        self.intercept_ = None
+
+    def fit(self, X, y):
+        self.n_samples_seen_ = 0
+        self.mean_ = self.comoment_ = None
+        return self.partial_fit(X, y)
+
+    def partial_fit(self, X, y):
+        """Fold a chunk of rows into the statistics and refresh the coefficients"""
+        X = np.asarray(X, dtype=np.float64)
+        X = X.reshape(-1, 1) if X.ndim == 1 else X
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if len(X) != len(y):
+            raise ValueError(f'X has {len(X)} rows but y has {len(y)}')
+        if X.shape[1] == 0:
+            raise ValueError('X has no feature columns')
+        if self.n_features_in_ is not None and X.shape[1] != self.n_features_in_:
+            raise ValueError(f'X has {X.shape[1]} features, the model was trained with {self.n_features_in_}')
+        # one NaN would stay in the running statistics for good, as sklearn's fit refuses it
+        if not (np.isfinite(X).all() and np.isfinite(y).all()):
+            raise ValueError('Input contains NaN or infinity')
+        if not len(y):
+            return self
+        self.n_features_in_ = X.shape[1]
+
+        Z = np.column_stack([X, y])
+        n_b = len(Z)
+        mean_b = Z.mean(axis=0)
+        centered = Z - mean_b
+        comoment_b = centered.T @ centered
+        if not self.n_samples_seen_:
+            self.mean_, self.comoment_ = mean_b, comoment_b
+        else:
+            n_a = self.n_samples_seen_
+            n = n_a + n_b
+            delta = mean_b - self.mean_
+            self.mean_ = self.mean_ + delta * (n_b / n)
+            self.comoment_ = self.comoment_ + comoment_b + np.outer(delta, delta) * (n_a * n_b / n)
+        self.n_samples_seen_ += n_b
+        self._solve()
+        return self
+
+    def _solve(self):
+        d = self.n_features_in_
+        sxx, sxy = self.comoment_[:d, :d], self.comoment_[:d, d]
+        self.coef_ = np.linalg.lstsq(sxx, sxy, rcond=None)[0]
+        self.intercept_ = float(self.mean_[d] - self.mean_[:d] @ self.coef_)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        X = X.reshape(-1, 1) if X.ndim == 1 else X
+        return X @ self.coef_ + self.intercept_
+
+
+if __name__ == '__main__':
+    import os
+
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
+    def compare(name, X, y, chunk):
+        started = time.perf_counter()
+        full = LinearRegression().fit(X, y)
+        refit_s = time.perf_counter() - started
+
+        model = IncrementalLinearRegression()
+        started = time.perf_counter()
+        for i in range(0, len(y), chunk):
+            model.partial_fit(X[i:i + chunk], y[i:i + chunk])
+        chunked_s = time.perf_counter() - started
+
+        # appending a few rows: one partial_fit against a refit of everything
+        extra_X, extra_y = X[:10] * 1.01, y[:10] * 1.01
+        started = time.perf_counter()
+        model.partial_fit(extra_X, extra_y)
+        append_s = time.perf_counter() - started
+        started = time.perf_counter()
+        full = LinearRegression().fit(np.vstack([X, extra_X]), np.concatenate([y, extra_y]))
+        append_refit_s = time.perf_counter() - started
+
+        coef_err = np.max(np.abs(model.coef_ - full.coef_) / np.maximum(np.abs(full.coef_), 1e-12))
+        intercept_err = abs(model.intercept_ - full.intercept_) / max(abs(full.intercept_), 1e-12)
+        ok = coef_err < 1e-6 and intercept_err < 1e-6
+        print(f'{name}: {len(y):,} rows × {X.shape[1]} features, chunks of {chunk:,}')
+        print(f'  full refit {refit_s * 1000:9.2f} ms   chunked {chunked_s * 1000:9.2f} ms')
+        print(f'  +10 rows: partial_fit {append_s * 1000:7.3f} ms   refit {append_refit_s * 1000:9.2f} ms')
+        print(f'  {"✅" if ok else "❌"} max relative difference: coef {coef_err:.1e}, intercept {intercept_err:.1e}')
+
+    data = pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data.csv'))
+    compare('data.csv', data.drop(columns='price').to_numpy(float), data['price'].to_numpy(float), chunk=4)
+
+    rng = np.random.default_rng(0)
+    X = rng.normal([1500, 3, 2, 10, 1], [400, 1, 0.5, 5, 0.5], size=(2_000_000, 5))
+    y = X @ [120, 5000, 8000, -1500, 9000] + 20000 + rng.normal(0, 5000, len(X))
+    compare('synthetic', X, y, chunk=100_000)
@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# trained models go to a scratch registry, not the app's models/ folder
+os.environ.setdefault('MODEL_DIR', tempfile.mkdtemp())
+from app import app  # noqa: E402
+
+# Throughput of /predict (one value per request) against /predict/batch in
+# its three body formats, measured in-process with Flask's test client so
+# only routing, parsing and prediction are timed, not the network.
+#
+#   python predict_benchmark.py
+
+ROWS = 100_000
+SINGLE_REQUESTS = 2_000   # /predict is timed on a sample and extrapolated to ROWS
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+if __name__ == '__main__':
+    client = app.test_client()
+    rng = np.random.default_rng(0)
+    hours = rng.uniform(0, 10, 50)
+    client.post('/train', json={'X': hours.tolist(), 'y': (hours * 9.5 + 12 + rng.normal(0, 2, 50)).tolist()})
+
+    values = rng.uniform(0, 10, ROWS)
+    sample = values[:SINGLE_REQUESTS]
+    seconds, single = timed(lambda: [client.post('/predict', json={'hours': v}).get_json()['predicted_marks']
+                                     for v in sample])
+    rates = {'/predict (one row per request)': SINGLE_REQUESTS / seconds}
+
+    ndjson = ''.join(json.dumps(values[i:i + 10_000].tolist()) + '\n' for i in range(0, ROWS, 10_000))
+    bodies = {
+        'json': dict(json={'hours': values.tolist()}),
+        'ndjson': dict(data=ndjson, content_type='application/x-ndjson'),
+        'binary': dict(data=values.astype('<f8').tobytes(), content_type='application/octet-stream'),
+    }
+    for name, body in bodies.items():
+        seconds, response = timed(lambda: client.post('/predict/batch', **body).get_data())
+        if name == 'binary':
+            batch = np.frombuffer(response, dtype='<f8')
+        elif name == 'ndjson':
+            batch = np.concatenate([json.loads(line) for line in response.splitlines()])
+        else:
+            batch = np.array(json.loads(response)['predicted_marks'])
+        assert np.allclose(batch[:SINGLE_REQUESTS], single), name
+        rates[f'/predict/batch ({name})'] = ROWS / seconds
+
+    base = rates['/predict (one row per request)']
+    print(f"{'route':36} {'rows/s':>12} {'speed-up':>9}")
+    for route, rate in rates.items():
+        print(f'{route:36} {rate:12,.0f} {rate / base:8.0f}x')
@@ -0,0 +1,101 @@
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+# Production serving for app.py: one listening socket, several worker
+# processes (pre-fork, POSIX only). Each worker runs a synchronous WSGI
+# server on the shared socket, and the kernel hands every connection to
+# one of them. The workers share trained models through MODEL_DIR and a
+# memory-mapped coefficient file (shared_coefficients.py), so /train on
+# any worker is visible to all. A worker that dies is replaced; SIGTERM or
+# Ctrl+C lets every worker finish its current request and exit.
+#
+#   python serve.py --port 5000 --workers 4
+#
+# app:app is a plain WSGI application, so other pre-fork servers work too,
+# e.g. SHARED_COEFFICIENTS=models/coefficients.bin gunicorn -w 4 app:app
+
+WORKERS = 2 * (os.cpu_count() or 1) + 1
+BACKLOG = 2048
+
+
+def run_worker(sock, wsgi_app):
+    from werkzeug.serving import make_server
+
+    server = make_server(*sock.getsockname()[:2], wsgi_app, fd=sock.fileno())
+    # finish the request in progress, then leave serve_forever (shutdown() waits for
+    # serve_forever to return, so it cannot run on this thread)
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # the master turns Ctrl+C into SIGTERM
+    server.serve_forever(poll_interval=0.2)
+
+
+def serve(host, port, workers):
+    sock = socket.create_server((host, port), backlog=BACKLOG)
+    sock.set_inheritable(True)
+
+    # import after the environment is set, so the app maps the shared coefficients
+    import app
+
+    # models saved by earlier runs become visible to every worker
+    for name in app.registry.names():
+        entry = app.registry.get(name)
+        if entry is not None and hasattr(entry.model, 'coef_') \
+                and app.shared.version(name) != entry.version:
+            app.shared.publish(name, entry.version, entry.model.coef_, entry.model.intercept_)
+
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(sock, app.app)
+            finally:
+                os._exit(0)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        spawn()
+    print(f'Serving app.py on http://{host}:{port} with {workers} worker processes (master {os.getpid()})')
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            print(f'Worker {pid} exited ({status}); starting a new one', file=sys.stderr)
+            time.sleep(0.1)     # do not spin if workers die at once
+            spawn()
+    sock.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve app.py with several worker processes')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    model_dir = os.environ.setdefault(
+        'MODEL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models'))
+    os.makedirs(model_dir, exist_ok=True)
+    os.environ.setdefault('SHARED_COEFFICIENTS', os.path.join(model_dir, 'coefficients.bin'))
+    serve(args.host, args.port, args.workers)
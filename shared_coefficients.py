@@ -0,0 +1,150 @@
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:     # Windows: one process only, the thread lock is enough
+    fcntl = None
+
+# Coefficients of the linear models, shared by every worker process.
+#
+# One memory-mapped file holds a header and a fixed number of slots; each
+# slot is one model: name, version, intercept and coefficients. Workers map
+# the file once and predict straight from the mapped coefficients, without
+# copying or unpickling anything. Writers (any worker handling /train) take
+# an exclusive file lock, and every slot has a sequence number that is odd
+# while the slot is being rewritten (a seqlock): a reader that sees it odd,
+# or changed after it computed, computes again. A generation counter in
+# the header goes up on every publish, so a worker notices that some model
+# changed with one 8-byte read.
+
+MAGIC = b'LINCOEF1'
+SLOTS = 1024
+MAX_FEATURES = 64
+HEADER = np.dtype([('magic', 'S8'), ('generation', '<u8'), ('slots', '<u4'), ('max_features', '<u4'),
+                   ('pad', 'V40')])
+
+
+def slot_dtype(max_features):
+    return np.dtype([('seq', '<u8'), ('version', '<u8'), ('n_features', '<u4'), ('used', '<u4'),
+                     ('name', 'S64'), ('intercept', '<f8'), ('coef', '<f8', (max_features,))])
+
+
+class SharedCoefficients:
+    """Memory-mapped table of linear model coefficients for several processes"""
+
+    def __init__(self, path, slots=SLOTS, max_features=MAX_FEATURES):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        with self._locked():
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                header = np.zeros(1, HEADER)
+                header['magic'], header['slots'], header['max_features'] = MAGIC, slots, max_features
+                with open(path, 'wb') as f:
+                    f.write(header.tobytes())
+                    f.truncate(HEADER.itemsize + slots * slot_dtype(max_features).itemsize)
+        self._header = np.memmap(path, HEADER, mode='r+', shape=(1,))
+        if self._header['magic'][0] != MAGIC:
+            raise ValueError(f'{path} is not a coefficient store')
+        self.slots = int(self._header['slots'][0])
+        self.max_features = int(self._header['max_features'][0])
+        table = np.memmap(path, slot_dtype(self.max_features), mode='r+', offset=HEADER.itemsize,
+                          shape=(self.slots,))
+        # one view per field, so reads touch only the bytes they need
+        self._seq, self._version, self._n_features = table['seq'], table['version'], table['n_features']
+        self._used, self._names = table['used'], table['name']
+        self._intercept, self._coef = table['intercept'], table['coef']
+        self._index = {}
+        self._seen = None
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive across threads and, where fcntl exists, processes"""
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.path + '.lock', 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @property
+    def generation(self):
+        """Goes up on every publish, by any process"""
+        return int(self._header['generation'][0])
+
+    def _slot(self, name):
+        generation = self.generation
+        if generation != self._seen:
+            # some model changed: re-read which slot holds which name
+            used = np.nonzero(self._used)[0]
+            self._index = {self._names[i].decode(): int(i) for i in used}
+            self._seen = generation
+        return self._index.get(name)
+
+    def check(self, name, coef, intercept):
+        """(coef, intercept) as stored, or ValueError if the table cannot hold this model"""
+        coef = np.asarray(coef, dtype=np.float64)
+        intercept = np.asarray(intercept, dtype=np.float64)
+        if coef.ndim > 1 and coef.shape[0] != 1 or intercept.size != 1:
+            raise ValueError('the coefficient store holds models with one target only')
+        coef = coef.ravel()
+        if len(coef) > self.max_features:
+            raise ValueError(f'{len(coef)} features; the coefficient store holds at most {self.max_features}')
+        if self._slot(name) is None and not (self._used == 0).any():
+            raise ValueError(f'All {self.slots} slots of {self.path} are in use')
+        return coef, float(intercept.item())
+
+    def publish(self, name, version, coef, intercept):
+        """Write the coefficients of version `version` of model `name`"""
+        coef, intercept = self.check(name, coef, intercept)
+        encoded = name.encode()
+        with self._locked():
+            slot = self._slot(name)
+            if slot is None:
+                free = np.nonzero(self._used == 0)[0]
+                if not len(free):
+                    raise RuntimeError(f'All {self.slots} slots of {self.path} are in use')
+                slot = int(free[0])
+            self._seq[slot] += 1                  # odd: readers retry
+            self._names[slot] = encoded
+            self._version[slot] = version
+            self._n_features[slot] = len(coef)
+            self._intercept[slot] = intercept
+            self._coef[slot, :len(coef)] = coef
+            self._used[slot] = 1
+            self._seq[slot] += 1                  # even again: consistent
+            self._header['generation'] += 1
+
+    def version(self, name):
+        """Latest published version of name, or None"""
+        slot = self._slot(name)
+        return int(self._version[slot]) if slot is not None else None
+
+    def n_features(self, name):
+        slot = self._slot(name)
+        return int(self._n_features[slot]) if slot is not None else None
+
+    def predict(self, name, X):
+        """(version, X @ coef + intercept) from the mapped coefficients, or None if name is unknown"""
+        slot = self._slot(name)
+        if slot is None:
+            return None
+        while True:
+            seq = int(self._seq[slot])
+            if seq & 1:
+                continue
+            n = int(self._n_features[slot])
+            version = int(self._version[slot])
+            predictions = X @ self._coef[slot, :n] + self._intercept[slot] if X.shape[1] == n else None
+            if int(self._seq[slot]) != seq:
+                continue    # rewritten while we read it
+            if predictions is None:
+                raise ValueError(f'X has {X.shape[1]} features, the model was trained with {n}')
+            return version, np.asarray(predictions)
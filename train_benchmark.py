@@ -0,0 +1,70 @@
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+# trained models go to a scratch registry, not the app's models/ folder
+os.environ.setdefault('MODEL_DIR', tempfile.mkdtemp())
+from app import app  # noqa: E402
+
+# Parse time and peak memory of /train for the same rows sent as JSON,
+# .npy, raw float64 and CSV (the columns of data.csv), measured in-process
+# with Flask's test client. Times come from a plain run; peak memory (what
+# the request allocates on top of the body it was sent, fit included) from
+# a second run under tracemalloc, which slows allocation-heavy parsing.
+#
+#   python train_benchmark.py --rows 1000000
+
+COLUMNS = ['area_sqft', 'bedrooms', 'bathrooms', 'age_years', 'garage', 'price']
+
+
+def make_rows(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.integers(600, 4000, rows), rng.integers(1, 6, rows), rng.integers(1, 4, rows),
+                         rng.integers(0, 60, rows), rng.integers(0, 3, rows)]).astype(np.float64)
+    y = X @ [110.0, 6000.0, 9000.0, -1200.0, 7000.0] + 30000 + rng.normal(0, 8000, rows).round()
+    return X, y
+
+
+def bodies(X, y):
+    table = np.column_stack([X, y])
+    npy = io.BytesIO()
+    np.save(npy, table)
+    csv = io.StringIO()
+    csv.write(','.join(COLUMNS) + '\n')
+    np.savetxt(csv, table, fmt='%.17g', delimiter=',')
+    return {
+        'json': ('/train', json.dumps({'X': X.tolist(), 'y': y.tolist()}).encode(), 'application/json'),
+        'npy': ('/train', npy.getvalue(), 'application/x-npy'),
+        'raw': (f'/train?features={X.shape[1]}', table.tobytes(), 'application/octet-stream'),
+        'csv': ('/train', csv.getvalue().encode(), 'text/csv'),
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare /train payload formats')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    client = app.test_client()
+    X, y = make_rows(args.rows)
+    print(f'{args.rows:,} rows × {X.shape[1]} features')
+    print(f"{'format':8} {'body MB':>9} {'parse ms':>10} {'request ms':>11} {'peak MB':>9}")
+    for name, (path, body, content_type) in bodies(X, y).items():
+        started = time.perf_counter()
+        response = client.post(path, data=body, content_type=content_type).get_json()
+        seconds = time.perf_counter() - started
+        assert response.get('rows') == args.rows, response
+
+        tracemalloc.start()
+        client.post(path, data=body, content_type=content_type)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f'{name:8} {len(body) / 1e6:9.1f} {response["parse_ms"]:10.1f} {seconds * 1000:11.1f} '
+              f'{peak / 1e6:9.1f}')
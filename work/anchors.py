@@ -0,0 +1,118 @@
+from bisect import bisect_left
+from collections import deque
+
+# -------------------------------
+# ONE-PASS ANCHOR INDEX (AHO-CORASICK)
+# -------------------------------
+# All section keywords are compiled into one automaton. Scanning a document
+# walks each line once, whatever the number of keywords, and records every
+# line a keyword occurs on. Section queries are then answered from those
+# position lists instead of rescanning the lines.
+
+
+class AnchorIndex:
+    """Aho-Corasick automaton over a fixed set of anchor keywords
+
+    Matching is case-insensitive, except for keywords listed in
+    `case_sensitive`, which must also match the original casing.
+    """
+
+    def __init__(self, keywords, case_sensitive=()):
+        self.keywords = list(dict.fromkeys(keywords))
+        self.case_sensitive = set(case_sensitive)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for k, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword.lower():
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(k)
+
+        # breadth-first failure links; outputs of the fallback state are
+        # merged in so every match is reported from the state it ends in
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text):
+        """Set of keywords occurring in text"""
+        lowered = text.lower()
+        same_length = len(lowered) == len(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for pos, ch in enumerate(lowered):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for k in out[state]:
+                keyword = self.keywords[k]
+                if keyword in self.case_sensitive:
+                    start = pos - len(keyword) + 1
+                    if not (text[start:pos + 1] == keyword if same_length else keyword in text):
+                        continue
+                found.add(keyword)
+        return found
+
+    def scan(self, lines):
+        """Locate every keyword occurrence in a list of lines in one pass"""
+        positions = {keyword: [] for keyword in self.keywords}
+        for i, line in enumerate(lines):
+            for keyword in self.find(line):
+                positions[keyword].append(i)
+        return AnchorHits(lines, positions)
+
+
+class AnchorHits:
+    """Line indexes of every anchor occurrence in one document"""
+
+    def __init__(self, lines, positions):
+        self.lines = lines
+        self.positions = positions
+
+    def all(self, keyword):
+        """Sorted line indexes containing keyword"""
+        return self.positions.get(keyword, [])
+
+    def first(self, keyword):
+        """First line index containing keyword, or None"""
+        found = self.positions.get(keyword)
+        return found[0] if found else None
+
+    def next_at_or_after(self, keyword, index):
+        """First line index >= index containing keyword, or None"""
+        found = self.positions.get(keyword, [])
+        k = bisect_left(found, index)
+        return found[k] if k < len(found) else None
+
+    def span(self, start_key, end_key):
+        """(start, end) indexes of start_key and the first end_key after it, or None"""
+        start = self.first(start_key)
+        if start is None:
+            return None
+        end = self.next_at_or_after(end_key, start + 1)
+        if end is None:
+            return None
+        return start, end
+
+    def between(self, start_key, end_key):
+        """Lines strictly between start_key and the next end_key after it"""
+        found = self.span(start_key, end_key)
+        if found is None:
+            return []
+        return self.lines[found[0] + 1:found[1]]
@@ -1,7 +1,10 @@
 import boto3
-import time
 import json
 
+from anchors import AnchorIndex
+from textract_document import TextractDocument
+from textract_jobs import TextractJobFailed, get_job_blocks
+
 # -------------------------------
 # AWS & FILE CONFIG
 # -------------------------------
@@ -24,63 +27,41 @@ job_id = response["JobId"]
 # print("🆔 Job started with ID:", job_id)
 
 # -------------------------------
-# 2️⃣ Wait for Completion
+# 2️⃣ Wait for Completion & 3️⃣ Collect All Pages
 # -------------------------------
-while True:
-    result = textract.get_document_analysis(JobId=job_id)
-    status = result["JobStatus"]
-    print("⏳ Job status:", status)
-    if status in ["SUCCEEDED", "FAILED"]:
-        break
-    time.sleep(5)
-
-if status != "SUCCEEDED":
+try:
+    all_blocks = get_job_blocks(
+        textract.get_document_analysis, job_id,
+        on_status=lambda status: print("⏳ Job status:", status)
+    )
+except TextractJobFailed:
     print("❌ Textract job failed.")
     exit()
 
-# -------------------------------
-# 3️⃣ Collect All Pages
-# -------------------------------
-all_blocks = []
-next_token = None
-while True:
-    if next_token:
-        result = textract.get_document_analysis(JobId=job_id, NextToken=next_token)
-    all_blocks.extend(result["Blocks"])
-    next_token = result.get("NextToken")
-    if not next_token:
-        break
-
 # -------------------------------
 # 4️⃣ Extract lines between two keywords
 # -------------------------------
 chain_list = change_list = ["Comments"]
 
-for i, block in enumerate(all_blocks):
-    if block["BlockType"] == "LINE" and block.get("Text") in change_list:
-        # Find next line after 'Comments'
-        for j in range(i + 1, len(all_blocks)):
-            next_block = all_blocks[j]
-            if next_block["BlockType"] == "LINE":
-                print(f"➡️ After '{block['Text']}': {next_block['Text']}")
-                break
+doc = TextractDocument(all_blocks)
+spatial = doc.spatial()
+
+for i in doc.of_type("LINE"):
+    if all_blocks[i].get("Text") in change_list:
+        # The line after 'Comments': on the same row if there is one, else under it
+        neighbours = spatial.right_of(i) or spatial.below(i)
+        if neighbours:
+            print(f"➡️ After '{all_blocks[i]['Text']}': {doc.text(neighbours[0])}")
 
 # Collect all LINE blocks
 lines = [block["Text"] for block in all_blocks if block["BlockType"] == "LINE" and "Text" in block]
 
-between1_start_idx = between1_end_idx = None
-between2_start_idx = between2_end_idx = None
-
-for i, text in enumerate(lines):
-    lower_text = text.lower().strip()
-    if "special instructions" in lower_text and between1_start_idx is None:
-        between1_start_idx = i
-    if "equipment & services" in lower_text and between1_end_idx is None:
-        between1_end_idx = i
-    if "stop 1" in lower_text and between2_start_idx is None:
-        between2_start_idx = i
-    if "stop 2" in lower_text and between2_end_idx is None:
-        between2_end_idx = i
+# Locate every section keyword in one pass
+hits = AnchorIndex(["special instructions", "equipment & services", "stop 1", "stop 2"]).scan(lines)
+between1_start_idx = hits.first("special instructions")
+between1_end_idx = hits.first("equipment & services")
+between2_start_idx = hits.first("stop 1")
+between2_end_idx = hits.first("stop 2")
 
 # -------------------------------
 # 4a️⃣ Between "Special Instructions" and "Equipment & Services"
@@ -184,38 +165,19 @@ if between2_start_idx is not None and between2_end_idx is not None and between2_
 
         print("\n📊 Extracting table data...\n")
 
-        block_map = {b["Id"]: b for b in all_blocks}
-        text_map = {b["Id"]: b["Text"] for b in all_blocks if "Text" in b}
-
-        table_data = []
-        for block in all_blocks:
-            if block["BlockType"] == "CELL":
-                row = block.get("RowIndex", 0)
-                col = block.get("ColumnIndex", 0)
-                cell_text = ""
-
-                if "Relationships" in block:
-                    for rel in block["Relationships"]:
-                        if rel["Type"] == "CHILD":
-                            for cid in rel["Ids"]:
-                                if cid in text_map:
-                                    cell_text += text_map[cid] + " "
-
-                table_data.append((row, col, cell_text.strip()))
-
-        # Sort by row and column
-        table_data.sort(key=lambda x: (x[0], x[1]))
-
-        # Print all table data
-        for row, col, text in table_data:
-            print(f"Row {row}, Col {col}: {text}")
+        # Print all table data, table by table
+        for table in doc.tables:
+            for row in range(1, table.rows + 1):
+                for col in range(1, table.cols + 1):
+                    print(f"Row {row}, Col {col}: {table.text(row, col)}")
 
 
         target_row = 3
         target_col = 2
 
+        # First table that has a cell at (target_row, target_col)
         specific_cell = next(
-            (text for (row, col, text) in table_data if row == target_row and col == target_col),
+            (table.text(target_row, target_col) for table in doc.tables if table.cell(target_row, target_col) >= 0),
             None
         )
 
@@ -264,7 +226,9 @@ else:
 
 
 import boto3
-import time
+
+from anchors import AnchorIndex
+from block_stream import iter_api_blocks, iter_lines
 
 BUCKET_NAME = "razin-textract-bucket-867927867048"
 DOCUMENT_NAME = "sample.pdf"
@@ -280,50 +244,18 @@ response = textract.start_document_analysis(
 job_id = response["JobId"]
 print(f"🆔 Started job: {job_id}")
 
-# --- Step 2: Wait for completion ---
-while True:
-    result = textract.get_document_analysis(JobId=job_id)
-    status = result["JobStatus"]
-    print("Job status:", status)
-    if status in ["SUCCEEDED", "FAILED"]:
-        break
-    time.sleep(5)
-
-if status != "SUCCEEDED":
-    raise RuntimeError("❌ Textract job failed.")
-
-# --- Step 3: Get all pages ---
-all_blocks = []
-next_token = None
-while True:
-    if next_token:
-        result = textract.get_document_analysis(JobId=job_id, NextToken=next_token)
-    all_blocks.extend(result["Blocks"])
-    next_token = result.get("NextToken")
-    if not next_token:
-        break
-
-# --- Step 4: Extract only line texts ---
-lines = [block["Text"] for block in all_blocks if block["BlockType"] == "LINE" and "Text" in block]
+# --- Step 2, 3 & 4: Wait for completion, then stream only the line texts ---
+lines = list(iter_lines(iter_api_blocks(
+    textract.get_document_analysis, job_id, block_types=["LINE"],
+    on_status=lambda status: print("Job status:", status)
+)))
 
-# --- Step 5: Helper function ---
-def extract_between(lines, start_key, end_key):
-    """
-    Extracts all lines between start_key and end_key (case-insensitive)
-    """
-    start_key = start_key.lower().strip()
-    end_key = end_key.lower().strip()
-
-    try:
-        start_idx = next(i for i, l in enumerate(lines) if start_key in l.lower())
-        end_idx = next(i for i, l in enumerate(lines) if end_key in l.lower() and i > start_idx)
-        return lines[start_idx + 1:end_idx]
-    except StopIteration:
-        return []
+# --- Step 5: Locate every section keyword in one pass ---
+hits = AnchorIndex(["special instructions", "equipment & services", "stop 1", "stop 2"]).scan(lines)
 
 # --- Step 6: Examples of extraction ---
-between_special = extract_between(lines, "special instructions", "equipment & services")
-between_stop = extract_between(lines, "stop 1", "stop 2")
+between_special = hits.between("special instructions", "equipment & services")
+between_stop = hits.between("stop 1", "stop 2")
 
 # --- Step 7: Output ---
 def print_section(title, data):
@@ -351,9 +283,10 @@ print_section("Stop 1 → Stop 2", between_stop)
 
 
 import boto3
-import time
 import json
-import re
+
+from layouts import TEMPLATES, print_load_tender
+from textract_jobs import TextractJobFailed, get_job_blocks
 
 BUCKET_NAME = "razin-textract-bucket-867927867048"
 DOCUMENT_NAME = "sample.pdf"
@@ -367,28 +300,15 @@ response = textract.start_document_analysis(
 )
 job_id = response["JobId"]
 
-while True:
-    result = textract.get_document_analysis(JobId=job_id)
-    status = result["JobStatus"]
-    print("Job status:", status)
-    if status in ["SUCCEEDED", "FAILED"]:
-        break
-    time.sleep(5)
-
-if status != "SUCCEEDED":
+try:
+    all_blocks = get_job_blocks(
+        textract.get_document_analysis, job_id,
+        on_status=lambda status: print("Job status:", status)
+    )
+except TextractJobFailed:
     print("❌ Textract job failed.")
     exit()
 
-all_blocks = []
-next_token = None
-while True:
-    if next_token:
-        result = textract.get_document_analysis(JobId=job_id, NextToken=next_token)
-    all_blocks.extend(result["Blocks"])
-    next_token = result.get("NextToken")
-    if not next_token:
-        break
-
 chain_list = change_list = ["Comments"]
 
 for i, block in enumerate(all_blocks):
@@ -404,129 +324,7 @@ for i, block in enumerate(all_blocks):
 
 lines = [block["Text"] for block in all_blocks if block["BlockType"] == "LINE" and "Text" in block]
 
-between1_start_idx = between1_end_idx = between2_start_idx = between2_end_idx = freight_terms = None
-
-for i, text in enumerate(lines):
-    lower_text = text.lower().strip()
-    if "special instructions" in lower_text and between1_start_idx is None:
-        between1_start_idx = i
-    if "equipment & services" in lower_text and between1_end_idx is None:
-        between1_end_idx = i
-    if "stop 1" in lower_text and between2_start_idx is None:
-        between2_start_idx = i
-    if "stop 2" in lower_text and between2_end_idx is None:
-        between2_end_idx = i
-    if "freight terms" in lower_text and freight_terms is None:
-        freight_terms = i
-
-if between1_start_idx is not None and between1_end_idx is not None and between1_start_idx < between1_end_idx:
-    between_lines = lines[between1_start_idx + 1:between1_end_idx]
-    if between_lines:
-        print("=======================")
-        for line in between_lines:
-            print(line)
-        print("=======================")
-
-if (
-    between2_start_idx is not None
-    and between2_end_idx is not None
-    and between2_start_idx < between2_end_idx
-):
-    between_lines = lines[between2_start_idx + 1 : between2_end_idx]
-    if between_lines:
-        print("=======================")
-        # print(between2_start_idx)
-        
-        if between2_start_idx < len(lines):
-            # Time
-            print(f"Time: {lines[between2_start_idx + 1]}")
-
-            # Extract clean phone
-            raw_phone_line = lines[between2_start_idx + 2]
-            match = re.search(r"\(?\d{3}\)?[ -]?\d{3}-\d{4}", raw_phone_line)
-            if match:
-                phone_number = match.group(0)
-                print(f"Phone: {phone_number}")
-            else:
-                print(f"Phone: {raw_phone_line}")
-            
-            # address
-            # print(f"Address: {lines[between2_start_idx+3]}")
-
-            # Address
-            address_line = lines[between2_start_idx + 3]
-            address_parts = [part.strip() for part in address_line.split(",") if part.strip()]
-            for idx, address in enumerate(address_parts, start=1):
-                print(f"{idx}: {address}")
-            print(f"{lines[between2_start_idx + 4]}")
-            selected_lines = lines[between2_start_idx:len(lines)]
-            commnet_number = 0
-            for i, text in enumerate(selected_lines, start=between2_start_idx):
-                if "Items" in text:
-                    commnet_number = i - between2_start_idx - 1
-            print(f"Comment: {lines[between2_start_idx + commnet_number]}")
-            # print(f"Comment: {lines[between2_start_idx + 5]}")
-            print(f"{lines[between2_start_idx + commnet_number+7]}")
-        else:
-            print(f"❌ Only {len(lines)} lines available.")
-        print("=======================")
-
-if (
-    between2_end_idx is not None
-    and len(lines) is not None
-    and between2_end_idx < len(lines)
-):
-    between_lines = lines[between2_end_idx + 1 : len(lines)]
-    if between_lines:
-        print("=======================")
-        print(between2_start_idx)
-        
-        if between2_end_idx < len(lines):
-            # Time
-            print(f"Time: {lines[between2_end_idx + 1]}")
-
-            # Extract clean phone
-            raw_phone_line = lines[between2_end_idx + 2]
-            match = re.search(r"\(?\d{3}\)?[ -]?\d{3}-\d{4}", raw_phone_line)
-            if match:
-                phone_number = match.group(0)
-                print(f"Phone: {phone_number}")
-            else:
-                print(f"Phone: {raw_phone_line}")
-            address_line = lines[between2_end_idx + 3]
-            address_parts = [part.strip() for part in address_line.split(",") if part.strip()]
-            for idx, address in enumerate(address_parts, start=1):
-                print(f"{idx}: {address}")
-            selected_lines = lines[between2_end_idx:len(lines)]
-            commnet_number = 0
-            for i, text in enumerate(selected_lines, start=between2_end_idx):
-                if "Items" in text:
-                    commnet_number = i - between2_end_idx - 1
-            print(f"Comment: {lines[between2_end_idx + commnet_number]}")
-            print(f"{lines[between2_end_idx + commnet_number+7]}")
-        else:
-            print(f"❌ Only {len(lines)} lines available.")
-        print("=======================")
-
-if (
-    freight_terms is not None
-    and len(lines) is not None
-    and freight_terms < len(lines)
-):
-    between_lines = lines[freight_terms + 1 : len(lines)]
-    if between_lines:
-        print("=======================")
-        match_1 = re.search(r"\d+(\.\d+)?", lines[freight_terms+6])
-        match_2 = re.search(r"\d+(\.\d+)?", lines[freight_terms+9])
-        if match_1:
-            number = match_1.group(0)
-            print(number)
-        else:
-            print("❌ No number found.")
-        print("=======================")
-        if match_2:
-            number = match_2.group(0)
-            print(number)
-        else:
-            print("❌ No number found.")
-        print("=======================")
\ No newline at end of file
+# Special instructions, every stop and the freight numbers come from the
+# declared load tender layout (layouts.py) instead of hand-written offsets
+record = TEMPLATES.run(lines)
+print_load_tender(record)
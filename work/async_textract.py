@@ -0,0 +1,262 @@
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from scheduler import FEATURE_TYPES, list_pdfs
+from textract_jobs import DONE_STATUSES, TextractJobFailed, estimate_page_count, poll_delays
+
+# -------------------------------
+# CONFIGURATION
+# -------------------------------
+START_TPS = 10             # StartDocumentAnalysis quota (us-east-1 default)
+GET_TPS = 10               # GetDocumentAnalysis quota
+MAX_IN_FLIGHT = 200        # Textract jobs running at once
+UPLOAD_AHEAD = 16          # uploaded PDFs waiting for a job slot before uploads pause
+UPLOAD_WORKERS = 4
+API_THREADS = 16           # threads running the blocking boto3 calls
+MAX_RETRIES = 8
+RETRY_BASE = 0.5           # seconds; doubled per throttled attempt, with jitter
+RETRY_MAX = 20.0
+
+THROTTLE_CODES = ("ThrottlingException", "ProvisionedThroughputExceededException", "LimitExceededException")
+
+
+def is_throttled(exc):
+    """True for the errors Textract raises when a TPS or job quota is exceeded"""
+    code = getattr(exc, "response", {}).get("Error", {}).get("Code")
+    return code in THROTTLE_CODES
+
+
+class TokenBucket:
+    """Async token bucket: at most `rate` acquisitions per second, bursts up to `capacity` (default: none)"""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity or 1
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        # waiters queue on the lock, so tokens are handed out first come, first served
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class AsyncTextract:
+    """Textract start / poll / fetch for one event loop, rate limited per API
+
+    The boto3 client stays synchronous: each call runs on a small thread
+    pool, and all waiting (token buckets, poll intervals, retry backoff)
+    is asyncio.sleep, so hundreds of jobs can be in flight on one loop.
+    Throttling errors are retried with exponential backoff; anything else
+    is raised. feature_types=None uses text detection instead of analysis.
+    """
+
+    def __init__(self, textract, feature_types=FEATURE_TYPES, start_tps=START_TPS, get_tps=GET_TPS,
+                 max_retries=MAX_RETRIES, executor=None, rng=random, metrics=None):
+        self.textract = textract
+        self.feature_types = feature_types
+        self.start_bucket = TokenBucket(start_tps)
+        self.get_bucket = TokenBucket(get_tps)
+        self.max_retries = max_retries
+        self.executor = executor
+        self.rng = rng
+        self.metrics = metrics
+        self.calls = 0
+        self.retries = 0
+
+    async def _call(self, bucket, fn, **kwargs):
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            self.calls += 1
+            if self.metrics:
+                self.metrics.count("api_calls", operation=fn.__name__)
+            try:
+                return await loop.run_in_executor(self.executor, partial(fn, **kwargs))
+            except Exception as exc:
+                if not is_throttled(exc) or attempt >= self.max_retries:
+                    raise
+            self.retries += 1
+            if self.metrics:
+                self.metrics.count("retries", operation=fn.__name__)
+            delay = min(RETRY_BASE * 2 ** attempt, RETRY_MAX)
+            await asyncio.sleep(delay / 2 + self.rng.uniform(0, delay / 2))
+            attempt += 1
+
+    async def start(self, bucket, key):
+        """Start a job for s3://bucket/key and return its JobId"""
+        location = {"S3Object": {"Bucket": bucket, "Name": key}}
+        if self.feature_types:
+            response = await self._call(self.start_bucket, self.textract.start_document_analysis,
+                                        DocumentLocation=location, FeatureTypes=self.feature_types)
+        else:
+            response = await self._call(self.start_bucket, self.textract.start_document_text_detection,
+                                        DocumentLocation=location)
+        return response["JobId"]
+
+    async def blocks(self, job_id, page_count=None):
+        """Wait for a job and return all of its blocks"""
+        get = self.textract.get_document_analysis if self.feature_types else self.textract.get_document_text_detection
+        delays = poll_delays(page_count, self.rng)
+        while True:
+            result = await self._call(self.get_bucket, get, JobId=job_id)
+            status = result["JobStatus"]
+            if status in DONE_STATUSES:
+                break
+            if status == "FAILED":
+                raise TextractJobFailed(f"Textract job {job_id} failed: {result.get('StatusMessage', status)}")
+            await asyncio.sleep(next(delays))
+
+        blocks = list(result["Blocks"])
+        while result.get("NextToken"):
+            result = await self._call(self.get_bucket, get, JobId=job_id, NextToken=result["NextToken"])
+            blocks.extend(result["Blocks"])
+        return blocks
+
+
+class AsyncScheduler:
+    """Upload → start → poll → fetch for a whole folder on one event loop
+
+    Upload workers put finished uploads on a queue of at most `upload_ahead`
+    documents; `max_in_flight` job workers take from it. When every job slot
+    is busy the queue fills and the uploaders wait, so S3 never runs far
+    ahead of what Textract can accept.
+    """
+
+    def __init__(self, s3, textract, bucket, max_in_flight=MAX_IN_FLIGHT, upload_ahead=UPLOAD_AHEAD,
+                 upload_workers=UPLOAD_WORKERS, feature_types=FEATURE_TYPES, uploader=None,
+                 start_tps=START_TPS, get_tps=GET_TPS, api_threads=API_THREADS, metrics=None):
+        self.s3 = s3
+        self.bucket = bucket
+        self.max_in_flight = max_in_flight
+        self.upload_ahead = upload_ahead
+        self.upload_workers = upload_workers
+        self.uploader = uploader
+        self.executor = ThreadPoolExecutor(max_workers=api_threads)
+        self.client = AsyncTextract(textract, feature_types, start_tps, get_tps, executor=self.executor,
+                                    metrics=metrics)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _upload(self, file_path, key):
+        if self.uploader is not None:
+            self.uploader.upload(file_path, key)
+        else:
+            self.s3.upload_file(file_path, self.bucket, key)
+
+    async def _upload_worker(self, folder, names, ready):
+        loop = asyncio.get_running_loop()
+        while not names.empty():
+            name = names.get_nowait()
+            file_path = os.path.join(folder, name)
+            try:
+                await loop.run_in_executor(self.executor, self._upload, file_path, name)
+                await ready.put((name, estimate_page_count(file_path), None))
+            except Exception as exc:
+                await ready.put((name, None, exc))
+
+    async def _job_worker(self, ready, results):
+        while True:
+            item = await ready.get()
+            if item is None:
+                return
+            name, page_count, error = item
+            if error is not None:
+                results[name] = (None, error)
+                continue
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                job_id = await self.client.start(self.bucket, name)
+                results[name] = (await self.client.blocks(job_id, page_count), None)
+            except Exception as exc:
+                results[name] = (None, exc)
+            finally:
+                self.in_flight -= 1
+
+    async def run_async(self, folder, filenames=None):
+        """[(filename, blocks, error)] for every PDF, in filename order"""
+        if filenames is None:
+            filenames = list_pdfs(folder)
+        names = asyncio.Queue()
+        for name in filenames:
+            names.put_nowait(name)
+        ready = asyncio.Queue(maxsize=self.upload_ahead)
+        results = {}
+
+        jobs = [asyncio.create_task(self._job_worker(ready, results)) for _ in range(self.max_in_flight)]
+        await asyncio.gather(*(self._upload_worker(folder, names, ready) for _ in range(self.upload_workers)))
+        for _ in jobs:
+            await ready.put(None)
+        await asyncio.gather(*jobs)
+        return [(name, *results[name]) for name in filenames]
+
+    def run(self, folder, filenames=None):
+        """Synchronous entry point for run_async"""
+        try:
+            return asyncio.run(self.run_async(folder, filenames))
+        finally:
+            self.executor.shutdown(wait=False)
+
+# -------------------------------
+# LOCAL CHECK: python async_textract.py --documents 300 --start-tps 5 --get-tps 10
+# -------------------------------
+# Runs copies of a saved document through FakeS3 / FakeTextract with
+# Textract-like TPS limits. The rate limiters should keep throttling rare,
+# and every throttled call should be retried until its document succeeds.
+
+
+if __name__ == "__main__":
+    from local_aws import FakeS3, FakeTextract
+
+    parser = argparse.ArgumentParser(description="Run many fake Textract jobs through AsyncScheduler")
+    parser.add_argument("--documents", type=int, default=300)
+    parser.add_argument("--source", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample.pdf"))
+    parser.add_argument("--results", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                          "pdf_files", "sample.pdf_textract.json"))
+    parser.add_argument("--start-tps", type=float, default=5, help="client-side Start rate")
+    parser.add_argument("--get-tps", type=float, default=10, help="client-side Get rate")
+    parser.add_argument("--service-tps", type=int, default=10, help="rate the fake service accepts for each API")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    try:
+        names = [f"doc{n:05d}.pdf" for n in range(args.documents)]
+        for name in names:
+            shutil.copy(args.source, os.path.join(folder, name))
+            shutil.copy(args.results, os.path.join(folder, f"{name}_textract.json"))
+        textract = FakeTextract(folder, start_tps=args.service_tps, get_tps=args.service_tps)
+        scheduler = AsyncScheduler(FakeS3(), textract, "local", max_in_flight=args.max_in_flight,
+                                   start_tps=args.start_tps, get_tps=args.get_tps)
+        started = time.perf_counter()
+        results = scheduler.run(folder, names)
+        seconds = time.perf_counter() - started
+    finally:
+        shutil.rmtree(folder)
+
+    failed = [(name, error) for name, _, error in results if error is not None]
+    print(f"✅ {len(results) - len(failed)}/{len(results)} documents in {seconds:.1f}s")
+    print(f"   API calls: {scheduler.client.calls}, throttled: {textract.throttled}, "
+          f"retried: {scheduler.client.retries}, peak jobs in flight: {scheduler.peak_in_flight}")
+    for name, error in failed[:5]:
+        print(f"❌ {name}: {error}")
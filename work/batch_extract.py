@@ -0,0 +1,117 @@
+import glob
+import os
+import sys
+
+import pandas as pd
+
+from block_stream import iter_file_blocks
+
+# -------------------------------
+# BATCH FIELD EXTRACTION
+# -------------------------------
+# The LINE text of many documents goes into one pandas column and every
+# pattern runs once over that column (Series.str.extract loops in C), so
+# reconciling an archive is a handful of vectorized passes instead of
+# re.search per line per document.
+
+PHONE = r"\(?\d{3}\)?[ -]?\d{3}-\d{4}"
+ZIP = r"\b\d{5}(?:-\d{4})?\b"
+DOOR = r"Door\s*\d+"
+NUMBER = r"\d+(?:\.\d+)?"
+
+# field name → pattern; patterns must not contain capturing groups
+FIELD_PATTERNS = {
+    "phone": PHONE,
+    "zip": ZIP,
+    "door": DOOR,
+    "number": NUMBER,
+}
+
+COLUMNS = ["document", "page", "line", "field", "value", "confidence"]
+
+
+def lines_frame(documents):
+    """One row per LINE block: document, page, line (index in document), text, confidence
+
+    documents is a dict or iterable of (name, blocks).
+    """
+    if isinstance(documents, dict):
+        documents = documents.items()
+    names, pages, numbers, texts, confidences = [], [], [], [], []
+    for name, blocks in documents:
+        line_no = 0
+        for block in blocks:
+            if block["BlockType"] != "LINE" or "Text" not in block:
+                continue
+            names.append(name)
+            pages.append(block.get("Page", 1))
+            numbers.append(line_no)
+            texts.append(block["Text"])
+            confidences.append(block.get("Confidence", 100.0) / 100.0)
+            line_no += 1
+    return pd.DataFrame({
+        "document": pd.Categorical(names),
+        "page": pd.array(pages, dtype="int32"),
+        "line": pd.array(numbers, dtype="int32"),
+        "text": pd.Series(texts, dtype="string"),
+        "confidence": pd.array(confidences, dtype="float32"),
+    })
+
+
+def extract_fields(lines, patterns=FIELD_PATTERNS):
+    """First match of every pattern on every line, as a long columnar table
+
+    Returns columns document, page, line, field, value, confidence, where
+    confidence is the Textract LINE confidence (0-1) of the matching line.
+    """
+    text = lines["text"]
+    parts = []
+    for field, pattern in patterns.items():
+        values = text.str.extract(f"({pattern})", expand=True)[0]
+        hit = values.notna().to_numpy()
+        if not hit.any():
+            continue
+        part = lines.loc[hit, ["document", "page", "line", "confidence"]]
+        part.insert(3, "field", field)
+        part.insert(4, "value", values[hit])
+        parts.append(part)
+    if not parts:
+        return pd.DataFrame({c: [] for c in COLUMNS})
+    table = pd.concat(parts, ignore_index=True)
+    table["field"] = pd.Categorical(table["field"], categories=list(patterns))
+    return table.sort_values(["document", "line", "field"], kind="stable", ignore_index=True)[COLUMNS]
+
+
+def first_values(table, field):
+    """First value of a field per document (e.g. exercise.py's extracted total)"""
+    rows = table[table["field"] == field]
+    return rows.groupby("document", observed=True)["value"].first()
+
+
+def load_documents(paths):
+    """Yield (name, LINE blocks) for saved _textract.json files or .blocks stores"""
+    for path in paths:
+        name = os.path.basename(path)
+        for suffix in ("_textract.json", "_textract.blocks"):
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+        yield name, iter_file_blocks(path, block_types=["LINE"])
+
+
+def extract_folder(folder):
+    """Field table for every saved Textract result in a folder"""
+    paths = sorted(glob.glob(os.path.join(folder, "*_textract.json")) +
+                   glob.glob(os.path.join(folder, "*_textract.blocks")))
+    return extract_fields(lines_frame(load_documents(paths)))
+
+# -------------------------------
+# python batch_extract.py pdf_files [out.csv]
+# -------------------------------
+
+if __name__ == "__main__":
+    table = extract_folder(sys.argv[1] if len(sys.argv) > 1 else "pdf_files")
+    if len(sys.argv) > 2:
+        table.to_csv(sys.argv[2], index=False)
+        print(f"💾 Saved {len(table)} field values to '{sys.argv[2]}'")
+    else:
+        print(table.to_string(index=False))
@@ -0,0 +1,210 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+
+from anchors import AnchorIndex
+from block_store import BlockStore, write_blocks
+from layouts import TEMPLATES
+from pipeline import extract_lines
+from synthetic_corpus import generate_document
+from textract_document import TextractDocument
+
+# -------------------------------
+# SCALING BENCHMARK FOR THE work/ PARSING CODE
+# -------------------------------
+# Every stage runs on synthetic documents of each size; wall time comes
+# from a plain run and peak memory from a second run under tracemalloc
+# (tracemalloc itself slows Python down, so the two are kept apart).
+#
+#   python benchmark.py                       # 1, 10, 100, 1000 pages
+#   python benchmark.py --pages 1 10000
+#   python benchmark.py --save-baseline       # write benchmarks/baseline.json
+#
+# Timings are kept relative to a fixed pure-Python reference workload timed
+# in the same run, so the saved baseline holds no machine-specific seconds
+# and carries over between machines. Stages slower than THRESHOLD × the
+# saved baseline, or bigger than MEMORY_THRESHOLD ×, are flagged; stages
+# that read or write files get IO_THRESHOLD, as disk speed does not scale
+# with the reference.
+
+DEFAULT_PAGES = [1, 10, 100, 1000]
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "baseline.json")
+THRESHOLD = 1.5              # timings of a shared machine vary by a third from run to run
+MEMORY_THRESHOLD = 1.25
+MIN_DELTA_S = 0.002          # ignore timing noise on sub-millisecond stages
+MIN_DELTA_BYTES = 256 * 1024
+IO_STAGES = {"json_save", "json_load", "blocks_save", "blocks_open_lines"}
+IO_THRESHOLD = 2.0
+IO_MIN_DELTA_S = 0.02
+SECTION_ANCHORS = AnchorIndex(["special instructions", "equipment & services", "stop", "freight terms", "Items"],
+                              case_sensitive=["Items"])
+
+
+def _stages(tmp_dir):
+    """(name, setup(blocks) -> arg, run(arg)) for every benchmarked stage"""
+    json_path = os.path.join(tmp_dir, "bench_textract.json")
+
+    blocks_path = os.path.join(tmp_dir, "bench_textract.blocks")
+
+    def save_json(blocks):
+        with open(json_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(blocks, ensure_ascii=False))
+
+    def prepare_load(blocks):
+        save_json(blocks)
+        return json_path
+
+    def load_json(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def prepare_store(blocks):
+        return write_blocks(blocks, blocks_path)
+
+    def store_lines(path):
+        return BlockStore(path).lines()
+
+    def tables(blocks):
+        doc = TextractDocument(blocks)
+        return [table.to_rows() for table in doc.tables]
+
+    return [
+        ("extract_lines", lambda blocks: blocks, extract_lines),
+        ("section_finding", extract_lines, SECTION_ANCHORS.scan),
+        ("template_records", extract_lines, TEMPLATES.run),
+        ("table_assembly", lambda blocks: blocks, tables),
+        ("json_save", lambda blocks: blocks, save_json),
+        ("json_load", prepare_load, load_json),
+        ("blocks_save", lambda blocks: blocks, prepare_store),
+        ("blocks_open_lines", prepare_store, store_lines),
+    ]
+
+
+def _reference(n=200_000):
+    """Fixed CPU-bound workload (strings, sorting, dicts) the stage timings are divided by"""
+    words = [f"line {i % 977} of page {i // 50}" for i in range(n)]
+    index = {}
+    for word in sorted(words):
+        index.setdefault(word.split()[1], []).append(word.upper())
+    return len(index)
+
+
+def _time(run, arg, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        run(arg)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _peak(run, arg):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(arg)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(page_sizes=DEFAULT_PAGES, repeat=3):
+    """{f"{stage}@{pages}": {"seconds", "reference", "relative", "peak_bytes", "blocks"}}
+
+    reference is the reference workload's time, taken again before each
+    document size so the machine's speed drifting during a long run does
+    not show up as a regression; relative is seconds / reference.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stages = _stages(tmp_dir)
+        for pages in page_sizes:
+            reference = _time(_reference, 200_000, 3)
+            blocks = generate_document(pages, seed=pages)
+            for name, setup, run in stages:
+                arg = setup(blocks)
+                # big inputs are timed once; small ones take the best of `repeat`
+                seconds = _time(run, arg, repeat if pages <= 100 else 1)
+                results[f"{name}@{pages}"] = {
+                    "stage": name,
+                    "pages": pages,
+                    "blocks": len(blocks),
+                    "seconds": seconds,
+                    "reference": reference,
+                    "relative": seconds / reference,
+                    "peak_bytes": _peak(run, arg),
+                }
+    return results
+
+
+def load_baseline(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    """Save relative timings and peak memory; absolute seconds only mean something on this machine"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    kept = {key: {k: v for k, v in r.items() if k not in ("seconds", "reference")} for key, r in results.items()}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"python": platform.python_version(), "results": kept}, f, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, threshold=THRESHOLD, memory_threshold=MEMORY_THRESHOLD):
+    """Keys of stages that got slower than threshold × baseline or bigger than memory_threshold ×
+
+    The baseline's relative timings are scaled by this run's reference
+    seconds, so both sides are in the current machine's seconds.
+    """
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if not base or "relative" not in base:
+            continue
+        io = current["stage"] in IO_STAGES
+        expected = base["relative"] * current["reference"]
+        slower = (current["seconds"] > expected * (max(threshold, IO_THRESHOLD) if io else threshold)
+                  and current["seconds"] - expected > (IO_MIN_DELTA_S if io else MIN_DELTA_S))
+        bigger = (current["peak_bytes"] > base["peak_bytes"] * memory_threshold
+                  and current["peak_bytes"] - base["peak_bytes"] > MIN_DELTA_BYTES)
+        if slower or bigger:
+            regressions.append(key)
+    return regressions
+
+
+def print_results(results, baseline, regressions):
+    print(f"{'stage':18} {'pages':>6} {'blocks':>9} {'ms':>10} {'ref ms':>8} {'peak MB':>9} {'vs base':>8}")
+    for key, r in results.items():
+        base = baseline.get(key)
+        ratio = f"{r['relative'] / base['relative']:.2f}x" if base and base.get("relative") else "-"
+        flag = "  ❌" if key in regressions else ""
+        print(f"{r['stage']:18} {r['pages']:6d} {r['blocks']:9d} {r['seconds'] * 1000:10.2f} "
+              f"{r['reference'] * 1000:8.1f} {r['peak_bytes'] / 1024 ** 2:9.2f} {ratio:>8}{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and measure the work/ parsing stages on synthetic documents")
+    parser.add_argument("--pages", type=int, nargs="+", default=DEFAULT_PAGES, help="document sizes in pages")
+    parser.add_argument("--repeat", type=int, default=3, help="timing repeats for small documents")
+    parser.add_argument("--save-baseline", action="store_true", help=f"store results in {BASELINE_FILE}")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.pages, repeat=args.repeat)
+    baseline = load_baseline()
+    regressions = compare(results, baseline)
+    print_results(results, baseline, regressions)
+    if args.save_baseline:
+        save_baseline(results)
+        print(f"\n💾 Saved baseline to '{BASELINE_FILE}'")
+    elif regressions:
+        print(f"\n❌ {len(regressions)} stage(s) regressed against the baseline "
+              f"(time > {THRESHOLD}x, file stages > {IO_THRESHOLD}x, memory > {MEMORY_THRESHOLD}x)")
+        raise SystemExit(1)
@@ -0,0 +1,321 @@
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+# -------------------------------
+# COLUMNAR TEXTRACT BLOCK STORE
+# -------------------------------
+# A "<name>.blocks" folder holds one .npy file per column plus meta.json.
+# Every column is opened with np.load(mmap_mode="r"), so opening a store is
+# a handful of mmap calls no matter how many pages the job had, and blocks
+# are only turned back into dicts when a page (or block) is asked for.
+# Floats are stored as float32 (~7 significant digits), plenty for Textract's
+# normalized geometry and confidence scores.
+#
+#   type, page, text_type, selection   per-block codes
+#   confidence, bbox (N×4)             per-block floats, NaN when absent
+#   row, col, row_span, col_span       CELL coordinates, 0 when absent
+#   ids                                string table of UUIDs (blocks first,
+#                                      then ids only seen in relationships)
+#   text_offsets / text                UTF-8 blob with CSR offsets
+#   poly_offsets / poly                polygon points (M×2) with CSR offsets
+#   ent_offsets / ent                  EntityTypes codes with CSR offsets
+#   rel_offsets / rel_type / rel_index relationships as CSR (type, target id)
+#   page_order / page_offsets          block indexes grouped by page
+
+FORMAT_VERSION = 1
+
+BLOCK_TYPES = [
+    "PAGE", "LINE", "WORD", "TABLE", "CELL", "MERGED_CELL", "KEY_VALUE_SET",
+    "SELECTION_ELEMENT", "TABLE_TITLE", "TABLE_FOOTER", "TITLE", "QUERY",
+    "QUERY_RESULT", "SIGNATURE", "LAYOUT_TEXT", "LAYOUT_TITLE", "LAYOUT_HEADER",
+    "LAYOUT_FOOTER", "LAYOUT_SECTION_HEADER", "LAYOUT_PAGE_NUMBER", "LAYOUT_LIST",
+    "LAYOUT_FIGURE", "LAYOUT_TABLE", "LAYOUT_KEY_VALUE",
+]
+RELATIONSHIP_TYPES = [
+    "VALUE", "CHILD", "COMPLEX_FEATURES", "MERGED_CELL", "TITLE", "ANSWER",
+    "TABLE", "TABLE_TITLE", "TABLE_FOOTER",
+]
+ENTITY_TYPES = [
+    "KEY", "VALUE", "COLUMN_HEADER", "TABLE_TITLE", "TABLE_FOOTER",
+    "TABLE_SECTION_TITLE", "TABLE_SUMMARY", "STRUCTURED_TABLE", "SEMI_STRUCTURED_TABLE",
+]
+TEXT_TYPES = [None, "PRINTED", "HANDWRITING"]
+SELECTION_STATUSES = [None, "SELECTED", "NOT_SELECTED"]
+
+BOX_KEYS = ("Left", "Top", "Width", "Height")
+# keys stored in columns; anything else goes to meta.json "extras"
+COLUMN_KEYS = {
+    "BlockType", "Page", "Id", "Text", "TextType", "SelectionStatus", "Confidence",
+    "Geometry", "Relationships", "EntityTypes", "RowIndex", "ColumnIndex",
+    "RowSpan", "ColumnSpan",
+}
+GRID_KEYS = (("RowIndex", "row"), ("ColumnIndex", "col"), ("RowSpan", "row_span"), ("ColumnSpan", "col_span"))
+
+
+def _code(table, value):
+    """Index of value in a code table, growing the table for unknown values"""
+    try:
+        return table.index(value)
+    except ValueError:
+        table.append(value)
+        return len(table) - 1
+
+
+def write_blocks(blocks, path):
+    """Write a list of Textract blocks to a .blocks store at path"""
+    n = len(blocks)
+    block_types = list(BLOCK_TYPES)
+    rel_types = list(RELATIONSHIP_TYPES)
+    entity_types = list(ENTITY_TYPES)
+    text_types = list(TEXT_TYPES)
+    selections = list(SELECTION_STATUSES)
+
+    ids = [b["Id"] for b in blocks]
+    id_index = {block_id: i for i, block_id in enumerate(ids)}
+
+    cols = {
+        "type": np.zeros(n, np.uint8),
+        "page": np.zeros(n, np.int32),
+        "text_type": np.zeros(n, np.uint8),
+        "selection": np.zeros(n, np.uint8),
+        "confidence": np.full(n, np.nan, np.float32),
+        "bbox": np.full((n, 4), np.nan, np.float32),
+        "row": np.zeros(n, np.int32),
+        "col": np.zeros(n, np.int32),
+        "row_span": np.zeros(n, np.int32),
+        "col_span": np.zeros(n, np.int32),
+        "text_offsets": np.zeros(n + 1, np.int64),
+        "poly_offsets": np.zeros(n + 1, np.int64),
+        "ent_offsets": np.zeros(n + 1, np.int64),
+        "rel_offsets": np.zeros(n + 1, np.int64),
+    }
+    text, poly, ent, rel_type, rel_index = bytearray(), [], [], [], []
+    extras = {}
+
+    for i, block in enumerate(blocks):
+        cols["type"][i] = _code(block_types, block["BlockType"])
+        cols["page"][i] = block.get("Page", 1)
+        cols["text_type"][i] = _code(text_types, block.get("TextType"))
+        cols["selection"][i] = _code(selections, block.get("SelectionStatus"))
+        if "Confidence" in block:
+            cols["confidence"][i] = block["Confidence"]
+        for key, name in GRID_KEYS:
+            cols[name][i] = block.get(key, 0)
+
+        if "Text" in block:
+            text += block["Text"].encode("utf-8")
+        cols["text_offsets"][i + 1] = len(text)
+
+        geometry = block.get("Geometry", {})
+        if "BoundingBox" in geometry:
+            cols["bbox"][i] = [geometry["BoundingBox"][k] for k in BOX_KEYS]
+        poly.extend((p["X"], p["Y"]) for p in geometry.get("Polygon", []))
+        cols["poly_offsets"][i + 1] = len(poly)
+
+        ent.extend(_code(entity_types, e) for e in block.get("EntityTypes", []))
+        cols["ent_offsets"][i + 1] = len(ent)
+
+        for rel in block.get("Relationships", []):
+            code = _code(rel_types, rel["Type"])
+            for target in rel["Ids"]:
+                if target not in id_index:
+                    id_index[target] = len(ids)
+                    ids.append(target)
+                rel_type.append(code)
+                rel_index.append(id_index[target])
+        cols["rel_offsets"][i + 1] = len(rel_index)
+
+        extra = {k: v for k, v in block.items() if k not in COLUMN_KEYS}
+        if block.get("Text") == "":
+            extra["Text"] = ""
+        if "Geometry" in block and set(geometry) - {"BoundingBox", "Polygon"}:
+            extra["_geometry"] = {k: v for k, v in geometry.items() if k not in ("BoundingBox", "Polygon")}
+        if extra:
+            extras[str(i)] = extra
+
+    cols["text"] = np.frombuffer(bytes(text), np.uint8)
+    cols["poly"] = np.array(poly, np.float32).reshape(-1, 2)
+    cols["ent"] = np.array(ent, np.uint8)
+    cols["rel_type"] = np.array(rel_type, np.uint8)
+    cols["rel_index"] = np.array(rel_index, np.int32)
+    cols["ids"] = np.array(ids, dtype="S36")
+
+    pages = int(cols["page"].max()) if n else 0
+    cols["page_order"] = np.argsort(cols["page"], kind="stable").astype(np.int32)
+    cols["page_offsets"] = np.searchsorted(
+        cols["page"][cols["page_order"]], np.arange(1, pages + 2)
+    ).astype(np.int64)
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "blocks": n,
+        "pages": pages,
+        "block_types": block_types,
+        "relationship_types": rel_types,
+        "entity_types": entity_types,
+        "text_types": text_types,
+        "selection_statuses": selections,
+        "no_geometry": [i for i, b in enumerate(blocks) if "Geometry" not in b],
+        "extras": extras,
+    }
+
+    tmp = f"{path}.tmp"
+    if os.path.exists(tmp):
+        shutil.rmtree(tmp)
+    os.makedirs(tmp)
+    for name, array in cols.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), array)
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(tmp, path)
+    return path
+
+
+def convert_json(json_path, out_path=None):
+    """Convert a saved <name>_textract.json into a .blocks store next to it"""
+    if out_path is None:
+        out_path = os.path.splitext(json_path)[0] + ".blocks"
+    with open(json_path, encoding="utf-8") as f:
+        blocks = json.load(f)
+    return write_blocks(blocks, out_path)
+
+
+class BlockStore:
+    """Read-only, memory-mapped view of a .blocks store"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported block store version {self.meta['version']} in {path}")
+        self._no_geometry = set(self.meta["no_geometry"])
+
+    def __getattr__(self, name):
+        # columns are mapped on first use
+        if name.startswith("_"):
+            raise AttributeError(name)
+        path = os.path.join(self.path, f"{name}.npy")
+        if not os.path.exists(path):
+            raise AttributeError(name)
+        array = np.load(path, mmap_mode="r")
+        setattr(self, name, array)
+        return array
+
+    def __len__(self):
+        return self.meta["blocks"]
+
+    @property
+    def page_count(self):
+        return self.meta["pages"]
+
+    def block_id(self, i):
+        return self.ids[i].decode("ascii")
+
+    def text_of(self, i):
+        start, end = self.text_offsets[i], self.text_offsets[i + 1]
+        return bytes(self.text[start:end]).decode("utf-8")
+
+    def type_code(self, block_type):
+        """Code used for block_type in this store, or -1 if it never occurs"""
+        types = self.meta["block_types"]
+        return types.index(block_type) if block_type in types else -1
+
+    def page_indexes(self, page):
+        """Block indexes on a page (1-based), in original order"""
+        if not 1 <= page <= self.page_count:
+            return np.empty(0, np.int32)
+        return self.page_order[self.page_offsets[page - 1]:self.page_offsets[page]]
+
+    def block(self, i):
+        """Rebuild block i as the dict Textract returned"""
+        meta = self.meta
+        i = int(i)
+        block = {"BlockType": meta["block_types"][self.type[i]]}
+        if not np.isnan(self.confidence[i]):
+            block["Confidence"] = float(self.confidence[i])
+        if self.text_offsets[i + 1] > self.text_offsets[i]:
+            block["Text"] = self.text_of(i)
+        if self.text_type[i]:
+            block["TextType"] = meta["text_types"][self.text_type[i]]
+        if self.selection[i]:
+            block["SelectionStatus"] = meta["selection_statuses"][self.selection[i]]
+        for key, name in GRID_KEYS:
+            value = int(getattr(self, name)[i])
+            if value:
+                block[key] = value
+
+        if i not in self._no_geometry:
+            geometry = {}
+            if not np.isnan(self.bbox[i, 0]):
+                geometry["BoundingBox"] = {k: float(v) for k, v in zip(BOX_KEYS, self.bbox[i])}
+            points = self.poly[self.poly_offsets[i]:self.poly_offsets[i + 1]]
+            geometry["Polygon"] = [{"X": float(x), "Y": float(y)} for x, y in points]
+            block["Geometry"] = geometry
+
+        block["Id"] = self.block_id(i)
+
+        start, end = self.rel_offsets[i], self.rel_offsets[i + 1]
+        if end > start:
+            relationships = []
+            for code, target in zip(self.rel_type[start:end], self.rel_index[start:end]):
+                rel_name = meta["relationship_types"][code]
+                if not relationships or relationships[-1]["Type"] != rel_name:
+                    relationships.append({"Type": rel_name, "Ids": []})
+                relationships[-1]["Ids"].append(self.block_id(target))
+            block["Relationships"] = relationships
+
+        start, end = self.ent_offsets[i], self.ent_offsets[i + 1]
+        if end > start:
+            block["EntityTypes"] = [meta["entity_types"][c] for c in self.ent[start:end]]
+
+        block["Page"] = int(self.page[i])
+
+        extra = meta["extras"].get(str(i))
+        if extra:
+            extra = dict(extra)
+            if "_geometry" in extra:
+                block.setdefault("Geometry", {}).update(extra.pop("_geometry"))
+            block.update(extra)
+        return block
+
+    def page_blocks(self, page):
+        """All blocks of one page as dicts"""
+        return [self.block(i) for i in self.page_indexes(page)]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.block(i)
+
+    def to_blocks(self):
+        return list(self)
+
+    def lines(self, page=None):
+        """LINE texts in reading order, optionally for a single page"""
+        code = self.type_code("LINE")
+        if page is None:
+            indexes = np.nonzero(self.type[:] == code)[0]
+        else:
+            indexes = self.page_indexes(page)
+            indexes = indexes[self.type[indexes] == code]
+        return [self.text_of(i) for i in indexes]
+
+
+def open_blocks(path):
+    """Open a .blocks store"""
+    return BlockStore(path)
+
+# -------------------------------
+# CONVERTER: python block_store.py pdf_files/*_textract.json
+# -------------------------------
+
+if __name__ == "__main__":
+    for json_path in sys.argv[1:]:
+        out_path = convert_json(json_path)
+        print(f"💾 {json_path} → {out_path}")
@@ -0,0 +1,135 @@
+import json
+import os
+
+import numpy as np
+
+from block_store import BlockStore
+from textract_jobs import iter_job_blocks
+
+# -------------------------------
+# STREAMING BLOCK READERS
+# -------------------------------
+# Generators that hand out one Textract block at a time, so consumers that
+# only need LINEs (or one page) never hold the whole job in memory.
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_json_array(f, chunk_size=CHUNK_SIZE):
+    """Yield the elements of a top-level JSON array of objects from a text file
+
+    Only the current block (plus one read chunk) is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    # find the opening bracket
+    while True:
+        while pos < len(buf) and buf[pos].isspace():
+            pos += 1
+        if pos < len(buf):
+            break
+        if eof:
+            return
+        fill()
+    if buf[pos] != "[":
+        raise ValueError("Expected a JSON array of Textract blocks")
+    pos += 1
+
+    while True:
+        while pos < len(buf) and (buf[pos].isspace() or buf[pos] == ","):
+            pos += 1
+        if pos == len(buf):
+            if eof:
+                raise ValueError("Unexpected end of file inside the block array")
+            fill()
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            block, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # block cut by the end of the buffer; read more and retry
+            if eof:
+                raise
+            fill()
+            continue
+        yield block
+        pos = end
+        if pos > chunk_size:
+            buf = buf[pos:]
+            pos = 0
+
+
+def _wanted(block_types, pages):
+    """Build the block filter for a BlockType set and page set"""
+    block_types = set(block_types) if block_types else None
+    pages = set(pages) if pages else None
+
+    def wanted(block):
+        if block_types is not None and block["BlockType"] not in block_types:
+            return False
+        if pages is not None and block.get("Page", 1) not in pages:
+            return False
+        return True
+    return wanted
+
+
+def filter_blocks(blocks, block_types=None, pages=None):
+    """Yield only blocks of the given BlockTypes on the given pages"""
+    if not block_types and not pages:
+        yield from blocks
+        return
+    wanted = _wanted(block_types, pages)
+    for block in blocks:
+        if wanted(block):
+            yield block
+
+
+def iter_file_blocks(path, block_types=None, pages=None):
+    """Stream blocks from a saved _textract.json file or a .blocks store"""
+    if os.path.isdir(path):
+        yield from iter_store_blocks(BlockStore(path), block_types, pages)
+        return
+    with open(path, encoding="utf-8") as f:
+        yield from filter_blocks(iter_json_array(f), block_types, pages)
+
+
+def iter_store_blocks(store, block_types=None, pages=None):
+    """Stream blocks from a BlockStore, filtering on its columns before decoding"""
+    if pages:
+        indexes = np.concatenate([store.page_indexes(p) for p in sorted(pages)] or [np.empty(0, np.int32)])
+    else:
+        indexes = np.arange(len(store))
+    if block_types:
+        codes = [store.type_code(t) for t in block_types]
+        indexes = indexes[np.isin(store.type[indexes], codes)]
+    for i in indexes:
+        yield store.block(i)
+
+
+def iter_api_blocks(get_page, job_id, block_types=None, pages=None, **kwargs):
+    """Stream blocks of a Textract job straight from the paginated API"""
+    yield from filter_blocks(iter_job_blocks(get_page, job_id, **kwargs), block_types, pages)
+
+
+def iter_lines(blocks):
+    """Yield LINE texts from any block iterable"""
+    for block in blocks:
+        if block["BlockType"] == "LINE" and "Text" in block:
+            yield block["Text"]
+
+
+def stream_lines(path, pages=None):
+    """LINE texts of a saved result, read without loading the block list"""
+    return iter_lines(iter_file_blocks(path, block_types=["LINE"], pages=pages))
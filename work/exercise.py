@@ -1,7 +1,9 @@
-import boto3
 import os
-import time
-import re
+
+from pipeline import parse_lines
+from results_store import ResultsStore
+from s3_transfer import S3Uploader, shared_client
+from textract_jobs import estimate_page_count, get_job_blocks
 
 # -------------------------------
 # CONFIGURATION
@@ -10,90 +12,103 @@ LOCAL_FOLDER = "D:/aws/work/"
 S3_BUCKET = "your-textract-bucket"
 REGION = "us-east-1"
 
-textract = boto3.client("textract", region_name=REGION)
-s3 = boto3.client("s3", region_name=REGION)
-
 # Example local reference data to compare
 reference_totals = {"invoice1.pdf": 499.0, "invoice2.pdf": 320.5}
 
+# -------------------------------
+# CLIENTS: created on first use, so importing stays offline
+# -------------------------------
+_uploader = None
+_results = None
+
+def aws_client(service):
+    """Pooled boto3 client for a service"""
+    return shared_client(service, REGION)
+
+def get_uploader():
+    global _uploader
+    if _uploader is None:
+        manifest = os.path.join(LOCAL_FOLDER, ".s3_manifest.json")
+        _uploader = S3Uploader(aws_client("s3"), S3_BUCKET, manifest_path=manifest)
+    return _uploader
+
+def get_results():
+    global _results
+    if _results is None:
+        _results = ResultsStore(os.path.join(LOCAL_FOLDER, ".results.sqlite"))
+    return _results
+
 # -------------------------------
 # FUNCTION: Upload file to S3
 # -------------------------------
 def upload_to_s3(file_path, bucket, key):
-    s3.upload_file(file_path, bucket, key)
-    print(f"Uploaded {file_path} to s3://{bucket}/{key}")
+    if get_uploader().upload(file_path, key, bucket=bucket):
+        print(f"Uploaded {file_path} to s3://{bucket}/{key}")
+    else:
+        print(f"Unchanged, not re-uploaded: s3://{bucket}/{key}")
 
 # -------------------------------
 # FUNCTION: Start Textract job
 # -------------------------------
 def start_textract(bucket, document):
-    response = textract.start_document_text_detection(
+    response = aws_client("textract").start_document_text_detection(
         DocumentLocation={'S3Object': {'Bucket': bucket, 'Name': document}}
     )
     return response["JobId"]
 
 # -------------------------------
-# FUNCTION: Wait for job to complete
+# FUNCTION: Wait for job to complete and collect every page
 # -------------------------------
-def wait_for_job(job_id):
-    while True:
-        result = textract.get_document_text_detection(JobId=job_id)
-        status = result["JobStatus"]
-        if status in ["SUCCEEDED", "FAILED"]:
-            break
-        time.sleep(5)
-    if status != "SUCCEEDED":
-        raise Exception("Textract job failed")
-    return result
+def wait_for_job(job_id, page_count=None):
+    return get_job_blocks(aws_client("textract").get_document_text_detection, job_id, page_count=page_count)
 
 # -------------------------------
 # FUNCTION: Extract lines from Textract result
 # -------------------------------
-def get_lines(textract_result):
-    lines = [block["Text"] for block in textract_result["Blocks"] if block["BlockType"] == "LINE"]
+def get_lines(blocks):
+    lines = [block["Text"] for block in blocks if block["BlockType"] == "LINE"]
     return lines
 
-# -------------------------------
-# FUNCTION: Extract total number from text
-# -------------------------------
-def extract_total(lines):
-    for line in lines:
-        match = re.search(r"\d+(\.\d+)?", line)
-        if match:
-            return float(match.group(0))
-    return None
-
 # -------------------------------
 # MAIN AUTOMATION LOOP
 # -------------------------------
-for filename in os.listdir(LOCAL_FOLDER):
-    if filename.lower().endswith(".pdf"):
-        local_path = os.path.join(LOCAL_FOLDER, filename)
-        s3_key = filename
-
-        # 1️⃣ Upload to S3
-        upload_to_s3(local_path, S3_BUCKET, s3_key)
-
-        # 2️⃣ Start Textract job
-        job_id = start_textract(S3_BUCKET, s3_key)
-        print(f"Started Textract job for {filename}, Job ID: {job_id}")
-
-        # 3️⃣ Wait for completion
-        result = wait_for_job(job_id)
-        print(f"Textract job completed for {filename}")
-
-        # 4️⃣ Extract lines
-        lines = get_lines(result)
-
-        # 5️⃣ Extract total number (example)
-        total = extract_total(lines)
-        print(f"Extracted total: {total}")
-
-        # 6️⃣ Compare with local reference data
-        ref_total = reference_totals.get(filename)
-        if ref_total is not None:
-            if total == ref_total:
-                print(f"✅ Total matches reference: {total}")
-            else:
-                print(f"❌ Total mismatch! Extracted: {total}, Reference: {ref_total}")
-        print("==============================\n")
+if __name__ == "__main__":
+    results = get_results()
+    for filename in os.listdir(LOCAL_FOLDER):
+        if filename.lower().endswith(".pdf"):
+            local_path = os.path.join(LOCAL_FOLDER, filename)
+            s3_key = filename
+
+            # 1️⃣ Upload to S3
+            upload_to_s3(local_path, S3_BUCKET, s3_key)
+
+            # 2️⃣ Start Textract job
+            job_id = start_textract(S3_BUCKET, s3_key)
+            print(f"Started Textract job for {filename}, Job ID: {job_id}")
+
+            # 3️⃣ Wait for completion
+            blocks = wait_for_job(job_id, page_count=estimate_page_count(local_path))
+            print(f"Textract job completed for {filename}")
+
+            # 4️⃣ Extract lines
+            lines = get_lines(blocks)
+
+            # 5️⃣ Extract total number (example) and store the record
+            record = parse_lines(lines)
+            results.add(filename, record)
+            print(f"Extracted total: {record['total']}")
+            print("==============================\n")
+
+    # -------------------------------
+    # 6️⃣ Compare with local reference data: one indexed query over the results
+    # store, which also covers documents extracted by earlier runs
+    # -------------------------------
+    results.flush()
+    for filename, total, ref_total in results.check_totals(reference_totals):
+        if total is None:
+            print(f"⚠️ {filename}: not extracted yet")
+        elif total == ref_total:
+            print(f"✅ {filename}: total matches reference: {total}")
+        else:
+            print(f"❌ {filename}: total mismatch! Extracted: {total}, Reference: {ref_total}")
+    results.close()
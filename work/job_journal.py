@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# -------------------------------
+# TEXTRACT JOB JOURNAL
+# -------------------------------
+# One SQLite row per document (or page-range shard): content hash, S3 key,
+# JobId, state, output path and last error. Every change is committed at
+# once, so after a crash the next run knows which jobs already finished,
+# which are still running server-side (and can be polled again instead of
+# paid for twice) and which failed.
+#
+#   python job_journal.py pdf_files/.textract_journal.sqlite   # state summary
+
+UPLOADED = "uploaded"
+STARTED = "started"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    document  TEXT PRIMARY KEY,
+    sha256    TEXT NOT NULL,
+    s3_key    TEXT,
+    job_id    TEXT,
+    state     TEXT NOT NULL,
+    output    TEXT,
+    error     TEXT,
+    attempts  INTEGER NOT NULL DEFAULT 0,
+    updated   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state);
+"""
+
+
+class JobJournal:
+    """SQLite journal of Textract jobs, safe to share between threads and processes
+
+    Each thread gets its own connection; the database runs in WAL mode with
+    a busy timeout, so concurrent writers wait for each other instead of
+    failing, and readers never block writers.
+    """
+
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=self.timeout)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, document):
+        """Journal entry for a document as a dict, or None"""
+        row = self._connect().execute("SELECT * FROM jobs WHERE document = ?", (document,)).fetchone()
+        return dict(row) if row else None
+
+    def _write(self, sql, params):
+        with self._connect() as db:   # one transaction per change
+            db.execute(sql, params)
+
+    def uploaded(self, document, sha256, s3_key):
+        """Start a fresh entry: the file is in S3 and no job is known yet"""
+        self._write(
+            "INSERT INTO jobs (document, sha256, s3_key, state, updated) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(document) DO UPDATE SET sha256 = excluded.sha256, s3_key = excluded.s3_key, "
+            "job_id = NULL, state = excluded.state, output = NULL, error = NULL, updated = excluded.updated",
+            (document, sha256, s3_key, UPLOADED, time.time()),
+        )
+
+    def started(self, document, job_id):
+        self._write("UPDATE jobs SET job_id = ?, state = ?, attempts = attempts + 1, updated = ? WHERE document = ?",
+                    (job_id, STARTED, time.time(), document))
+
+    def succeeded(self, document):
+        self._write("UPDATE jobs SET state = ?, error = NULL, updated = ? WHERE document = ?",
+                    (SUCCEEDED, time.time(), document))
+
+    def saved(self, document, sha256, output):
+        """Record that the finished blocks of a document were written to output"""
+        self._write(
+            "INSERT INTO jobs (document, sha256, state, output, updated) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(document) DO UPDATE SET sha256 = excluded.sha256, state = excluded.state, "
+            "output = excluded.output, error = NULL, updated = excluded.updated",
+            (document, sha256, SUCCEEDED, output, time.time()),
+        )
+
+    def failed(self, document, error):
+        self._write("UPDATE jobs SET state = ?, error = ?, updated = ? WHERE document = ?",
+                    (FAILED, str(error), time.time(), document))
+
+    def entries(self, state=None):
+        """All entries, optionally in one state, ordered by document"""
+        db = self._connect()
+        if state is None:
+            rows = db.execute("SELECT * FROM jobs ORDER BY document")
+        else:
+            rows = db.execute("SELECT * FROM jobs WHERE state = ? ORDER BY document", (state,))
+        return [dict(row) for row in rows]
+
+    def summary(self):
+        """{state: number of entries}"""
+        return dict(self._connect().execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+    def close(self):
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+if __name__ == "__main__":
+    journal = JobJournal(sys.argv[1] if len(sys.argv) > 1 else os.path.join("pdf_files", ".textract_journal.sqlite"))
+    for state, count in sorted(journal.summary().items()):
+        print(f"{state:10} {count}")
+    for entry in journal.entries(FAILED):
+        print(f"❌ {entry['document']}: {entry['error']}")
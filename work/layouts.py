@@ -0,0 +1,78 @@
+from templates import TemplateSet
+
+# -------------------------------
+# DOCUMENT LAYOUTS
+# -------------------------------
+# Data for templates.py. Offsets are counted in LINE blocks from the
+# anchor line, as Textract returns them in reading order.
+
+PHONE = r"\(?\d{3}\)?[ -]?\d{3}-\d{4}"
+
+LOAD_TENDER = {
+    "name": "load_tender",
+    "fingerprint": ["carrier load tender", "freight terms"],
+    "case_sensitive": ["Items"],
+    "sections": [
+        {"name": "special_instructions", "between": ["special instructions", "equipment & services"]},
+    ],
+    "groups": [
+        {
+            # "Stop 1 (pickup)", "Stop 2 (drop)", ...
+            "name": "stops",
+            "repeat": "stop",
+            "requires": 5,
+            "fields": [
+                {"name": "time", "offset": 1},
+                {"name": "phone", "offset": 2, "regex": PHONE, "default": "line"},
+                {"name": "address", "offset": 3, "split": ","},
+                {"name": "comment", "from": "Items", "offset": -1},
+                {"name": "item", "from": "Items", "offset": 6},
+            ],
+        },
+        {
+            # Charge Details table under "Freight Terms"
+            "name": "freight",
+            "repeat": "freight terms",
+            "requires": 9,
+            "limit": 1,
+            "fields": [
+                {"name": "line_haul_rate", "offset": 6, "number": True},
+                {"name": "fuel_rate", "offset": 9, "number": True},
+            ],
+        },
+    ],
+}
+
+LAYOUTS = [LOAD_TENDER]
+
+# compiled once per process; unrecognised documents are read as load tenders
+TEMPLATES = TemplateSet(LAYOUTS, default="load_tender")
+
+
+def print_load_tender(record):
+    """Print a load_tender record the way pdf.py has always reported it"""
+    if record.get("special_instructions") is not None:
+        print("=======================")
+        for line in record["special_instructions"]:
+            print(line)
+        print("=======================")
+
+    for stop in record.get("stops", []):
+        print("=======================")
+        if "time" in stop:
+            print(f"Time: {stop['time']}")
+            print(f"Phone: {stop['phone']}")
+            for a_idx, address in enumerate(stop["address"] or [], start=1):
+                print(f"{a_idx}: {address}")
+            if stop["comment"] is not None:
+                print(f"Comment: {stop['comment']}")
+                if stop["item"] is not None:
+                    print(stop["item"])
+        print("=======================")
+
+    for freight in record.get("freight", []):
+        if "line_haul_rate" in freight:
+            print("=======================")
+            print(freight["line_haul_rate"] or "❌ No number found.")
+            print(freight["fuel_rate"] or "❌ No number found.")
+            print("=======================")
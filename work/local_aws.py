@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+from pdf_shards import parse_shard_key
+
+# -------------------------------
+# LOCAL STAND-INS FOR THE S3 / TEXTRACT CLIENTS
+# -------------------------------
+# These mimic the handful of boto3 calls the work/ scripts make, so the
+# pipeline can be exercised without AWS. Textract results are served from
+# the saved "<name>_textract.json" files that pdf.py writes.
+
+
+class FakeClientError(Exception):
+    """Stand-in for botocore's ClientError, with the same .response shape"""
+
+    def __init__(self, code, operation):
+        super().__init__(f"An error occurred ({code}) when calling the {operation} operation")
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3:
+    """In-memory replacement for boto3.client("s3")"""
+
+    def __init__(self):
+        self.objects = {}
+        self.etags = {}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def upload_file(self, file_path, bucket, key, Config=None, **kwargs):
+        with open(file_path, "rb") as f:
+            body = f.read()
+        # same ETag rule as S3: plain MD5, or MD5 of part MD5s for multipart
+        if Config is not None and len(body) >= Config.multipart_threshold:
+            size = Config.multipart_chunksize
+            parts = [hashlib.md5(body[i:i + size]).digest() for i in range(0, len(body), size)]
+            etag = f"{hashlib.md5(b''.join(parts)).hexdigest()}-{len(parts)}"
+        else:
+            etag = hashlib.md5(body).hexdigest()
+        with self._lock:
+            self.calls.append(("upload_file", bucket, key))
+            self.objects[(bucket, key)] = body
+            self.etags[(bucket, key)] = etag
+
+    def head_object(self, Bucket, Key, **kwargs):
+        with self._lock:
+            self.calls.append(("head_object", Bucket, Key))
+            if (Bucket, Key) not in self.objects:
+                raise FakeClientError("404", "HeadObject")
+            return {"ETag": f'"{self.etags[(Bucket, Key)]}"', "ContentLength": len(self.objects[(Bucket, Key)])}
+
+
+TEXT_BLOCK_TYPES = ("PAGE", "LINE", "WORD")
+
+
+def _text_blocks(blocks):
+    """What text detection returns for a document: PAGE / LINE / WORD blocks only"""
+    kept = [b for b in blocks if b["BlockType"] in TEXT_BLOCK_TYPES]
+    ids = {b["Id"] for b in kept}
+    result = []
+    for block in kept:
+        if "Relationships" in block:
+            block = dict(block, Relationships=[
+                {**rel, "Ids": [i for i in rel["Ids"] if i in ids]} for rel in block["Relationships"]
+            ])
+        result.append(block)
+    return result
+
+
+class FakeTextract:
+    """In-memory replacement for boto3.client("textract")
+
+    results_folder holds "<document>_textract.json" files; every started job
+    reports IN_PROGRESS for `polls_before_done` polls and then pages through
+    the saved blocks `page_size` at a time. A page-range shard key
+    (pdf_shards.shard_key) is served the matching pages of its document,
+    renumbered from 1. With `seconds_per_page`, a job also stays in progress
+    until that much time per page has passed, and its completion is
+    published to `notifications` like the SNS channel would (text detection
+    jobs take `text_seconds_per_page` instead, when given, and only return
+    PAGE / LINE / WORD blocks). `start_tps` /
+    `get_tps` cap the start_* / get_* calls per second; calls above the cap
+    raise ThrottlingException, as Textract does.
+    """
+
+    def __init__(self, results_folder, polls_before_done=1, page_size=1000,
+                 seconds_per_page=0.0, notifications=None, start_tps=None, get_tps=None,
+                 text_seconds_per_page=None):
+        self.results_folder = results_folder
+        self.polls_before_done = polls_before_done
+        self.page_size = page_size
+        self.seconds_per_page = seconds_per_page
+        self.text_seconds_per_page = seconds_per_page if text_seconds_per_page is None else text_seconds_per_page
+        self.notifications = notifications
+        self.tps = {"start": start_tps, "get": get_tps}
+        self.jobs = {}
+        self.calls = []
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._saved = {}
+        self._recent = {"start": deque(), "get": deque()}
+
+    def _throttle(self, kind, operation):
+        """Raise ThrottlingException when `kind` calls exceeded their TPS over the last second"""
+        limit = self.tps[kind]
+        if limit is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            recent = self._recent[kind]
+            while recent and recent[0] <= now - 1.0:
+                recent.popleft()
+            if len(recent) >= limit:
+                self.throttled += 1
+                raise FakeClientError("ThrottlingException", operation)
+            recent.append(now)
+
+    def _load(self, document):
+        """Saved blocks for a document or shard key, or None"""
+        shard = parse_shard_key(document)
+        name = shard[0] if shard else document
+        with self._lock:
+            if name not in self._saved:
+                # parsed once, so the shards of one document don't each re-read it
+                path = os.path.join(self.results_folder, f"{name}_textract.json")
+                if not os.path.exists(path):
+                    return None
+                with open(path, encoding="utf-8") as f:
+                    self._saved[name] = json.load(f)
+            blocks = self._saved[name]
+        if shard:
+            _, first, last = shard
+            blocks = [dict(b, Page=b.get("Page", 1) - first + 1) for b in blocks
+                      if first <= b.get("Page", 1) <= last]
+        return blocks
+
+    def _start(self, api, DocumentLocation, **kwargs):
+        self._throttle("start", api)
+        document = DocumentLocation["S3Object"]["Name"]
+        job_id = uuid.uuid4().hex
+        blocks = self._load(document)
+        text_only = api == "start_document_text_detection"
+        if text_only and blocks is not None:
+            blocks = _text_blocks(blocks)
+        pages = max((b.get("Page", 1) for b in blocks), default=0) if blocks else 0
+        delay = (self.text_seconds_per_page if text_only else self.seconds_per_page) * pages
+        with self._lock:
+            self.calls.append((api, document))
+            self.jobs[job_id] = {"document": document, "polls": 0, "blocks": blocks, "pages": pages,
+                                 "ready_at": time.monotonic() + delay}
+        if self.notifications is not None and delay:
+            status = "SUCCEEDED" if blocks is not None else "FAILED"
+            timer = threading.Timer(delay, self.notifications.publish, (job_id, status))
+            timer.daemon = True
+            timer.start()
+        return {"JobId": job_id}
+
+    def _get(self, api, JobId, NextToken=None, **kwargs):
+        self._throttle("get", api)
+        with self._lock:
+            self.calls.append((api, JobId))
+            if JobId not in self.jobs:
+                raise FakeClientError("InvalidJobIdException", api)
+            job = self.jobs[JobId]
+            job["polls"] += 1
+            polls = job["polls"]
+        if polls <= self.polls_before_done or time.monotonic() < job["ready_at"]:
+            return {"JobStatus": "IN_PROGRESS"}
+
+        blocks = job["blocks"]
+        if blocks is None:
+            return {"JobStatus": "FAILED", "StatusMessage": f"No saved result for {job['document']}"}
+
+        start = int(NextToken or 0)
+        end = start + self.page_size
+        result = {
+            "JobStatus": "SUCCEEDED",
+            "DocumentMetadata": {"Pages": job["pages"]},
+            "Blocks": blocks[start:end],
+        }
+        if end < len(blocks):
+            result["NextToken"] = str(end)
+        return result
+
+    def start_document_analysis(self, **kwargs):
+        return self._start("start_document_analysis", **kwargs)
+
+    def get_document_analysis(self, **kwargs):
+        return self._get("get_document_analysis", **kwargs)
+
+    def start_document_text_detection(self, **kwargs):
+        return self._start("start_document_text_detection", **kwargs)
+
+    def get_document_text_detection(self, **kwargs):
+        return self._get("get_document_text_detection", **kwargs)
@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# -------------------------------
+# PIPELINE METRICS
+# -------------------------------
+# Spans time each pipeline stage of each document; their durations go into
+# one fixed-bucket histogram per stage (exponential buckets, so observing a
+# value is a bisect and two additions), which is what Prometheus histograms
+# expect and is enough to estimate p50 / p95 / p99. Counters carry labels.
+# Everything sits behind one lock and costs about a microsecond per span,
+# so it can stay on in production runs.
+#
+#   metrics = Metrics()
+#   with metrics.span("upload", document="a.pdf"):
+#       ...
+#   metrics.count("api_calls", operation="get_document_analysis")
+#   metrics.prometheus()   /   metrics.report()
+
+BUCKETS = tuple(0.0001 * 2 ** i for i in range(24))   # 0.1 ms … ~14 min, then +Inf
+QUANTILES = (0.5, 0.95, 0.99)
+PREFIX = "textract_pipeline"
+MAX_DOCUMENTS = 10000   # per-document totals kept; older documents leave the report, not the histograms
+
+
+class Histogram:
+    """Counts per bucket plus sum and count"""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate of the q-quantile, interpolated inside its bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return BUCKETS[-1]
+
+
+def _labels(labels):
+    return ",".join(f'{k}="{v}"' for k, v in labels)
+
+
+class Metrics:
+    """Stage histograms, labelled counters and per-document stage totals for one run"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.histograms = {}
+        self.counters = {}
+        self.documents = OrderedDict()   # most recently observed last
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage, document=None):
+        """Time the body of a with-statement as one `stage` of `document`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, document)
+
+    def observe(self, stage, seconds, document=None):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+            if document is not None:
+                stages = self.documents.get(document)
+                if stages is None:
+                    stages = self.documents[document] = {}
+                    if len(self.documents) > MAX_DOCUMENTS:
+                        self.documents.popitem(last=False)
+                else:
+                    self.documents.move_to_end(document)
+                stages[stage] = stages.get(stage, 0.0) + seconds
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def counter(self, name, **labels):
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def report(self):
+        """JSON-ready summary: stage quantiles, counters and per-document stage seconds"""
+        with self._lock:
+            stages = {
+                stage: {"count": h.count, "sum": h.sum,
+                        **{f"p{round(q * 100)}": h.quantile(q) for q in QUANTILES}}
+                for stage, h in sorted(self.histograms.items())
+            }
+            counters = {
+                f"{name}{{{_labels(labels)}}}" if labels else name: value
+                for (name, labels), value in sorted(self.counters.items())
+            }
+            documents = {doc: dict(stages_) for doc, stages_ in sorted(self.documents.items())}
+        return {"started": self.started, "seconds": time.time() - self.started,
+                "stages": stages, "counters": counters, "documents": documents}
+
+    def prometheus(self, prefix=PREFIX):
+        """Prometheus text exposition format"""
+        out = []
+        with self._lock:
+            name = f"{prefix}_stage_seconds"
+            out += [f"# HELP {name} Time spent in each pipeline stage", f"# TYPE {name} histogram"]
+            for stage, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS + (float("inf"),), h.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    out.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                out.append(f'{name}_sum{{stage="{stage}"}} {h.sum!r}')
+                out.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+
+            seen = set()
+            for (counter, labels), value in sorted(self.counters.items()):
+                metric = f"{prefix}_{counter}_total"
+                if metric not in seen:
+                    seen.add(metric)
+                    out.append(f"# TYPE {metric} counter")
+                out.append(f"{metric}{{{_labels(labels)}}} {value}" if labels else f"{metric} {value}")
+        return "\n".join(out) + "\n"
+
+    def write(self, folder, name="run"):
+        """Write <name>_metrics.json and <name>_metrics.prom into folder; returns both paths"""
+        json_path = os.path.join(folder, f"{name}_metrics.json")
+        prom_path = os.path.join(folder, f"{name}_metrics.prom")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        with open(prom_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        return json_path, prom_path
+
+
+def print_summary(metrics):
+    """Per-stage latency table of a run"""
+    report = metrics.report()
+    print(f"{'stage':16} {'count':>6} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage, s in report["stages"].items():
+        print(f"{stage:16} {s['count']:6d} {s['sum']:9.2f} {s['p50'] * 1000:9.1f} "
+              f"{s['p95'] * 1000:9.1f} {s['p99'] * 1000:9.1f}")
+    for name, value in report["counters"].items():
+        print(f"{name}: {value}")
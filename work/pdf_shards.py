@@ -0,0 +1,93 @@
+import os
+import re
+import uuid
+
+from pypdf import PdfReader, PdfWriter
+
+# -------------------------------
+# CONFIGURATION
+# -------------------------------
+SHARD_PAGES = 50          # pages per Textract job when a PDF is sharded
+
+SHARD_KEY = re.compile(r"^(?P<key>.+)\.pages-(?P<first>\d+)-(?P<last>\d+)\.pdf$")
+
+
+def count_pages(pdf_path):
+    """Exact number of pages in a PDF"""
+    return len(PdfReader(pdf_path).pages)
+
+
+def page_ranges(pages, shard_pages=SHARD_PAGES):
+    """1-based inclusive (first, last) page ranges covering `pages` pages"""
+    return [(first, min(first + shard_pages - 1, pages)) for first in range(1, pages + 1, shard_pages)]
+
+
+def shard_key(key, first, last):
+    """S3 key of the shard holding pages first..last of `key`"""
+    return f"{key}.pages-{first:04d}-{last:04d}.pdf"
+
+
+def parse_shard_key(key):
+    """(original key, first, last) for a shard key, or None for a whole document"""
+    match = SHARD_KEY.match(key)
+    if not match:
+        return None
+    return match["key"], int(match["first"]), int(match["last"])
+
+
+def page_runs(pages):
+    """Contiguous (first, last) runs of a set of 1-based page numbers"""
+    runs = []
+    for page in sorted(set(pages)):
+        if runs and runs[-1][1] == page - 1:
+            runs[-1] = (runs[-1][0], page)
+        else:
+            runs.append((page, page))
+    return runs
+
+
+def split_ranges(pdf_path, ranges, out_dir):
+    """Write one PDF per (first, last) page range of pdf_path into out_dir; returns [(first, last, path)]"""
+    reader = PdfReader(pdf_path)
+    name = os.path.basename(pdf_path)
+    shards = []
+    for first, last in ranges:
+        writer = PdfWriter()
+        for index in range(first - 1, last):
+            writer.add_page(reader.pages[index])
+        path = os.path.join(out_dir, shard_key(name, first, last))
+        with open(path, "wb") as f:
+            writer.write(f)
+        shards.append((first, last, path))
+    return shards
+
+
+def split_pdf(pdf_path, out_dir, shard_pages=SHARD_PAGES):
+    """Split pdf_path into shard_pages-long shards in out_dir; returns [(first, last, path)]"""
+    return split_ranges(pdf_path, page_ranges(count_pages(pdf_path), shard_pages), out_dir)
+
+
+def merge_shard_blocks(shards):
+    """One block list from [(first_page, blocks)] of shard jobs, as if the PDF was one job
+
+    Page numbers are shifted by each shard's first page. Textract Ids are
+    unique per job, not across jobs, so any Id already used by an earlier
+    shard is replaced (in the block and in every Relationship pointing at
+    it) before the shard is appended. Blocks are updated in place and
+    returned in page order.
+    """
+    merged = []
+    seen = set()
+    for first, blocks in sorted(shards, key=lambda shard: shard[0]):
+        renamed = {b["Id"]: str(uuid.uuid4()) for b in blocks if b["Id"] in seen}
+        offset = first - 1
+        for block in blocks:
+            block["Page"] = block.get("Page", 1) + offset
+            if renamed:
+                block["Id"] = renamed.get(block["Id"], block["Id"])
+                for rel in block.get("Relationships", ()):
+                    rel["Ids"] = [renamed.get(i, i) for i in rel["Ids"]]
+            seen.add(block["Id"])
+        merged.extend(blocks)
+    merged.sort(key=lambda block: block["Page"])   # stable: reading order within a page is kept
+    return merged
@@ -0,0 +1,44 @@
+import re
+
+from layouts import TEMPLATES
+
+# -------------------------------
+# PARSING PIPELINE (NO AWS)
+# -------------------------------
+# extract_lines → section / field extraction, shared by pdf.py, exercise.py
+# and replay.py. Nothing here imports boto3, so saved results can be parsed
+# offline.
+
+NUMBER = re.compile(r"\d+(\.\d+)?")
+
+
+def extract_lines(blocks):
+    """Extract LINE texts from Textract blocks"""
+    return [block["Text"] for block in blocks if block["BlockType"] == "LINE" and "Text" in block]
+
+
+def extract_number_from_line(line):
+    """Extract the first number from a text line"""
+    match = NUMBER.search(line)
+    return match.group(0) if match else None
+
+
+def extract_total(lines):
+    """First number in the document, as a float"""
+    for line in lines:
+        match = NUMBER.search(line)
+        if match:
+            return float(match.group(0))
+    return None
+
+
+def parse_lines(lines):
+    """Structured record for one document's LINE texts"""
+    record = TEMPLATES.run(lines) or {"template": None}
+    record["total"] = extract_total(lines)
+    return record
+
+
+def parse_blocks(blocks):
+    """Structured record for one document's Textract blocks"""
+    return parse_lines(extract_lines(blocks))
@@ -0,0 +1,126 @@
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from block_store import BlockStore
+from pipeline import extract_lines, parse_lines
+
+# -------------------------------
+# OFFLINE REPLAY OF SAVED TEXTRACT RESULTS
+# -------------------------------
+# Runs the same extract_lines → section → field pipeline as pdf.py over
+# saved _textract.json files / .blocks stores in a process pool. No boto3
+# client is ever created, so this works without AWS access and doubles as
+# a speed regression check.
+
+RESULT_PATTERNS = ("*_textract.json", "*_textract.blocks")
+
+
+def find_results(paths):
+    """Expand files and folders into a sorted list of saved results"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path) and not path.rstrip("/\\").endswith(".blocks"):
+            for pattern in RESULT_PATTERNS:
+                found.extend(glob.glob(os.path.join(path, pattern)))
+        else:
+            found.append(path)
+    return sorted(found)
+
+
+def load_blocks(path):
+    """All blocks of a saved _textract.json file or .blocks store"""
+    if os.path.isdir(path):
+        return BlockStore(path).to_blocks()
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def result_name(path):
+    """PDF filename a saved result belongs to"""
+    name = os.path.basename(path.rstrip("/\\"))
+    for suffix in ("_textract.json", "_textract.blocks"):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def replay_file(path):
+    """Parse one saved result; returns its record plus per-stage timings"""
+    started = time.perf_counter()
+    blocks = load_blocks(path)
+    loaded = time.perf_counter()
+    lines = extract_lines(blocks)
+    extracted = time.perf_counter()
+    record = parse_lines(lines)
+    parsed = time.perf_counter()
+    return {
+        "path": path,
+        "blocks": len(blocks),
+        "lines": len(lines),
+        "load_s": loaded - started,
+        "lines_s": extracted - loaded,
+        "parse_s": parsed - extracted,
+        "total_s": parsed - started,
+        "record": record,
+    }
+
+
+def replay(paths, workers=None, repeat=1):
+    """Replay every saved result (repeat times) and return (results, summary)"""
+    files = find_results(paths) * repeat
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    if workers == 1:
+        results = [replay_file(path) for path in files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(files) // (workers * 4))
+            results = list(pool.map(replay_file, files, chunksize=chunksize))
+    wall = time.perf_counter() - started
+
+    blocks = sum(r["blocks"] for r in results)
+    summary = {
+        "documents": len(results),
+        "workers": workers,
+        "wall_s": wall,
+        "cpu_s": sum(r["total_s"] for r in results),
+        "docs_per_s": len(results) / wall if wall else 0.0,
+        "blocks_per_s": blocks / wall if wall else 0.0,
+    }
+    return results, summary
+
+
+def print_report(results, summary):
+    """Per-document timings and overall throughput"""
+    print(f"{'document':40} {'blocks':>7} {'lines':>6} {'load ms':>8} {'lines ms':>9} {'parse ms':>9}")
+    for r in results:
+        print(f"{os.path.basename(r['path'])[:40]:40} {r['blocks']:7d} {r['lines']:6d} "
+              f"{r['load_s'] * 1000:8.2f} {r['lines_s'] * 1000:9.2f} {r['parse_s'] * 1000:9.2f}")
+    print("=======================")
+    print(f"📄 {summary['documents']} documents on {summary['workers']} workers in {summary['wall_s']:.3f} s")
+    print(f"⚡ {summary['docs_per_s']:.1f} docs/s, {summary['blocks_per_s']:.0f} blocks/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay saved Textract results through the parsing pipeline")
+    parser.add_argument("paths", nargs="*", default=["pdf_files"], help="result files or folders")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count, 1 = in-process)")
+    parser.add_argument("--repeat", type=int, default=1, help="replay every file this many times")
+    parser.add_argument("--records", action="store_true", help="print the extracted records as JSON")
+    parser.add_argument("--store", metavar="DB", help="write the records to a results_store.ResultsStore database")
+    args = parser.parse_args()
+
+    results, summary = replay(args.paths, workers=args.workers, repeat=args.repeat)
+    if args.records:
+        for r in results:
+            print(json.dumps({"path": r["path"], **r["record"]}, ensure_ascii=False))
+    if args.store:
+        from results_store import ResultsStore
+
+        with ResultsStore(args.store) as store:
+            store.add_many((result_name(r["path"]), r["record"]) for r in results)
+    print_report(results, summary)
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# -------------------------------
+# CONFIGURATION
+# -------------------------------
+MAX_CACHE_BYTES = 2 * 1024 ** 3   # evict least recently used results above 2 GB
+INDEX_FILE = "index.json"
+
+
+class CacheMiss(Exception):
+    """Raised in cache-only mode for a document that has no stored result"""
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Textract blocks stored by SHA-256 of the PDF bytes + FeatureTypes
+
+    Layout: <folder>/index.json plus one <key>.json per result. The index
+    keeps the size and last use of every entry so the cache can be trimmed
+    to `max_bytes` by evicting the least recently used results first.
+    """
+
+    def __init__(self, folder, max_bytes=MAX_CACHE_BYTES, cache_only=False):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.cache_only = cache_only
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        path = os.path.join(self.folder, INDEX_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+        # drop entries whose result file was removed by hand
+        return {k: v for k, v in index.items() if os.path.exists(os.path.join(self.folder, v["file"]))}
+
+    def _save_index(self):
+        path = os.path.join(self.folder, INDEX_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, path)
+
+    def key(self, pdf_path, feature_types):
+        """Cache key for a PDF analyzed with the given FeatureTypes"""
+        features = ",".join(sorted(feature_types or []))
+        return f"{file_sha256(pdf_path)}-{hashlib.sha256(features.encode()).hexdigest()[:12]}"
+
+    def get(self, key):
+        """Return the stored blocks for key, or None
+
+        The use is recorded in memory only; the index is written by the
+        next put() or eviction rather than on every hit.
+        """
+        with self._lock:
+            entry = self.index.get(key)
+            if entry is None:
+                return None
+            entry["last_used"] = time.time()
+            path = os.path.join(self.folder, entry["file"])
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            # evicted by another thread since the lookup: a miss
+            return None
+
+    def put(self, key, blocks, source=None):
+        """Store blocks under key and evict old entries if the cache is too big"""
+        filename = f"{key}.json"
+        path = os.path.join(self.folder, filename)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            # dumps + write takes the C encoder; json.dump to a file does not
+            f.write(json.dumps(blocks, ensure_ascii=False, separators=(",", ":")))
+        os.replace(tmp, path)
+        with self._lock:
+            self.index[key] = {
+                "file": filename,
+                "size": os.path.getsize(path),
+                "last_used": time.time(),
+                "source": source,
+            }
+            self._evict()
+            self._save_index()
+
+    def adopt(self, pdf_path, json_path, feature_types):
+        """Register an existing <name>_textract.json written after its PDF
+
+        Returns True when the file was added to the cache.
+        """
+        if not os.path.exists(json_path) or os.path.getmtime(json_path) < os.path.getmtime(pdf_path):
+            return False
+        key = self.key(pdf_path, feature_types)
+        if key in self.index:
+            return False
+        with open(json_path, encoding="utf-8") as f:
+            blocks = json.load(f)
+        self.put(key, blocks, source=os.path.basename(pdf_path))
+        return True
+
+    def total_bytes(self):
+        return sum(entry["size"] for entry in self.index.values())
+
+    def _evict(self):
+        total = self.total_bytes()
+        for key in sorted(self.index, key=lambda k: self.index[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            entry = self.index.pop(key)
+            total -= entry["size"]
+            try:
+                os.remove(os.path.join(self.folder, entry["file"]))
+            except FileNotFoundError:
+                pass
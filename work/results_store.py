@@ -0,0 +1,315 @@
+import argparse
+import json
+import re
+import sqlite3
+import threading
+import time
+
+from layouts import PHONE
+
+# -------------------------------
+# RESULTS STORE
+# -------------------------------
+# The records pdf.py / replay.py extract (pipeline.parse_lines) as rows in
+# SQLite: one per document (template, total, freight rates, special
+# instructions) and one per stop (time, phone, company, address, ZIP,
+# comment, item). Rows are buffered and written `batch_size` documents per
+# transaction; phone, ZIP and stop date are indexed, so lookups and the
+# reference comparison of exercise.py are queries instead of reruns.
+#
+#   python results_store.py pdf_files/.results.sqlite --phone "(770) 601-6427"
+#   python results_store.py pdf_files/.results.sqlite --check-totals reference.json
+
+BATCH_SIZE = 500           # documents per transaction
+FLUSH_SECONDS = 5.0        # flush a partial batch once its oldest record is this old
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    document              TEXT PRIMARY KEY,
+    template              TEXT,
+    total                 REAL,
+    line_haul_rate        REAL,
+    fuel_rate             REAL,
+    special_instructions  TEXT,
+    stops                 INTEGER NOT NULL,
+    updated               REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stops (
+    document  TEXT NOT NULL,
+    stop      INTEGER NOT NULL,
+    anchor    TEXT,
+    time      TEXT,
+    date      TEXT,
+    phone     TEXT,
+    company   TEXT,
+    street    TEXT,
+    city      TEXT,
+    state     TEXT,
+    zip       TEXT,
+    comment   TEXT,
+    item      TEXT,
+    PRIMARY KEY (document, stop)
+);
+CREATE INDEX IF NOT EXISTS stops_phone ON stops (phone);
+CREATE INDEX IF NOT EXISTS stops_zip ON stops (zip);
+CREATE INDEX IF NOT EXISTS stops_date ON stops (date);
+"""
+
+DATE = re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b")
+PHONE_NUMBER = re.compile(PHONE)
+ZIP = re.compile(r"\b\d{5}(?:-\d{4})?\b")
+STATE = re.compile(r"^\s*([A-Z]{2})\b")
+STOP_COLUMNS = ("document", "stop", "anchor", "time", "date", "phone", "company", "street",
+                "city", "state", "zip", "comment", "item")
+
+
+def phone_key(phone):
+    """The 10 digits of a phone number, the form it is stored and looked up in, or None
+
+    The parser falls back to the whole line when no phone number matched;
+    street numbers and ZIP codes in such a line are not stored as a phone.
+    """
+    match = PHONE_NUMBER.search(phone or "")
+    return re.sub(r"\D", "", match.group(0)) if match else None
+
+
+def iso_date(text):
+    """First mm/dd/yyyy in text as yyyy-mm-dd, or None"""
+    match = DATE.search(text or "")
+    if not match:
+        return None
+    month, day, year = match.groups()
+    return f"{year}-{int(month):02d}-{int(day):02d}"
+
+
+def _number(value):
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def stop_row(document, number, stop):
+    """Row of the stops table for one stop of a load_tender record
+
+    address is the stop's address line split on commas:
+    company, street, city, "ST 12345".
+    """
+    address = list(stop.get("address") or [])
+    company, street, city, region = (address + [None] * 4)[:4]
+    state = STATE.match(region) if region else None
+    zipcode = ZIP.search(", ".join(address[2:]))
+    return (document, number, stop.get("anchor"), stop.get("time"), iso_date(stop.get("time")),
+            phone_key(stop.get("phone")), company, street, city,
+            state.group(1) if state else None, zipcode.group(0) if zipcode else None,
+            stop.get("comment"), stop.get("item"))
+
+
+def document_row(document, record, stops):
+    freight = (record.get("freight") or [{}])[0]
+    instructions = record.get("special_instructions")
+    return (document, record.get("template"), record.get("total"),
+            _number(freight.get("line_haul_rate")), _number(freight.get("fuel_rate")),
+            "\n".join(instructions) if instructions is not None else None, stops, time.time())
+
+
+class ResultsStore:
+    """SQLite sink and query interface for extracted records
+
+    add() is safe to call from worker threads: rows are buffered under a
+    lock and written in one transaction per `batch_size` documents, or by
+    a background thread once the oldest buffered record is `flush_seconds`
+    old, so a long-running daemon never holds records back. Adding a
+    document again replaces its previous rows. close() writes the last
+    partial batch. Connections are per thread and the database runs in WAL
+    mode, as in job_journal.JobJournal.
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS, timeout=30.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = {}    # document → (document row, stop rows); a document added again replaces its entry
+        self._oldest = None
+        self._connections = []
+        self._closing = threading.Event()
+        self._flusher = None
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            # used by its own thread only; close() may close it from another
+            db = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            with self._lock:
+                self._connections.append(db)
+        return db
+
+    # ---- writing ----
+
+    def add(self, document, record):
+        """Buffer the rows of one record (as returned by pipeline.parse_lines)"""
+        stops = [stop_row(document, n, stop) for n, stop in enumerate(record.get("stops") or [], start=1)
+                 if "time" in stop]
+        row = document_row(document, record, len(stops))
+        with self._lock:
+            self._pending.pop(document, None)
+            self._pending[document] = (row, stops)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_when_due, name="results-flush", daemon=True)
+                self._flusher.start()
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def add_many(self, records):
+        """add() for an iterable of (document, record)"""
+        for document, record in records:
+            self.add(document, record)
+
+    def _flush_when_due(self):
+        """Background thread: flush a partial batch once its oldest record is flush_seconds old"""
+        while True:
+            with self._lock:
+                due = self._oldest + self.flush_seconds - time.monotonic() if self._oldest is not None \
+                    else self.flush_seconds
+            if due <= 0:
+                self.flush()
+            elif self._closing.wait(due):
+                return
+
+    def flush(self):
+        """Write every buffered row in one transaction"""
+        db = self._connect()
+        with self._lock:
+            pending, self._pending, self._oldest = self._pending, {}, None
+            if not pending:
+                return
+            documents = [row for row, _ in pending.values()]
+            stops = [stop for _, rows in pending.values() for stop in rows]
+            with db:
+                db.executemany("DELETE FROM stops WHERE document = ?", [(row[0],) for row in documents])
+                db.executemany(f"INSERT OR REPLACE INTO documents VALUES ({', '.join('?' * 8)})", documents)
+                db.executemany(f"INSERT OR REPLACE INTO stops ({', '.join(STOP_COLUMNS)}) "
+                               f"VALUES ({', '.join('?' * len(STOP_COLUMNS))})", stops)
+
+    # ---- queries ----
+
+    def document(self, document):
+        """Document row plus its stops as dicts, or None"""
+        db = self._connect()
+        row = db.execute("SELECT * FROM documents WHERE document = ?", (document,)).fetchone()
+        if row is None:
+            return None
+        return {**dict(row), "stops": self.stops(document=document)}
+
+    def stops(self, document=None, phone=None, zipcode=None, date=None, date_to=None):
+        """Stops matching every given filter, ordered by document and stop
+
+        phone matches on digits only; date is yyyy-mm-dd, and with date_to
+        selects the stops from date through date_to.
+        """
+        where, params = [], []
+        if document is not None:
+            where.append("document = ?")
+            params.append(document)
+        if phone is not None:
+            where.append("phone = ?")
+            params.append(phone_key(phone) or re.sub(r"\D", "", phone))    # bare digits are fine to look up
+        if zipcode is not None:
+            where.append("zip = ?")
+            params.append(zipcode)
+        if date is not None:
+            where.append("date BETWEEN ? AND ?" if date_to else "date = ?")
+            params += [date, date_to] if date_to else [date]
+        sql = "SELECT * FROM stops"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return [dict(row) for row in self._connect().execute(sql + " ORDER BY document, stop", params)]
+
+    def totals(self, documents):
+        """{document: extracted total} for the documents that are in the store"""
+        return {row["document"]: row["total"] for row in self._joined(documents, "d.document, d.total")}
+
+    def check_totals(self, reference):
+        """[(document, extracted total, reference total)] for every document in reference
+
+        The extracted total is None for documents not in the store. This is
+        one indexed join, however many documents the store holds.
+        """
+        totals = self.totals(reference)
+        return [(document, totals.get(document), expected) for document, expected in sorted(reference.items())]
+
+    def _joined(self, documents, columns):
+        db = self._connect()
+        db.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (document TEXT PRIMARY KEY)")
+        db.execute("DELETE FROM wanted")
+        db.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", [(d,) for d in documents])
+        rows = db.execute(f"SELECT {columns} FROM wanted w JOIN documents d ON d.document = w.document").fetchall()
+        db.execute("DELETE FROM wanted")
+        db.commit()
+        return rows
+
+    def count(self):
+        """(documents, stops) in the store"""
+        db = self._connect()
+        return (db.execute("SELECT COUNT(*) FROM documents").fetchone()[0],
+                db.execute("SELECT COUNT(*) FROM stops").fetchone()[0])
+
+    def close(self):
+        """Write the last partial batch and close the connections of every thread"""
+        self._closing.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for db in connections:
+            db.close()
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the extracted records")
+    parser.add_argument("path", help="results database")
+    parser.add_argument("--document")
+    parser.add_argument("--phone")
+    parser.add_argument("--zip", dest="zipcode")
+    parser.add_argument("--date", help="yyyy-mm-dd")
+    parser.add_argument("--date-to", help="yyyy-mm-dd, with --date for a range")
+    parser.add_argument("--check-totals", metavar="JSON", help='{"document.pdf": total, ...} to compare against')
+    args = parser.parse_args()
+
+    store = ResultsStore(args.path)
+    if args.check_totals:
+        with open(args.check_totals, encoding="utf-8") as f:
+            reference = json.load(f)
+        for document, total, expected in store.check_totals(reference):
+            if total is None:
+                print(f"⚠️ {document}: not in the results store")
+            elif total == expected:
+                print(f"✅ {document}: total matches reference: {total}")
+            else:
+                print(f"❌ {document}: total mismatch! Extracted: {total}, Reference: {expected}")
+    elif any(v is not None for v in (args.document, args.phone, args.zipcode, args.date)):
+        for stop in store.stops(args.document, args.phone, args.zipcode, args.date, args.date_to):
+            print(json.dumps(stop, ensure_ascii=False))
+    else:
+        documents, stops = store.count()
+        print(f"{documents} documents, {stops} stops")
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+# -------------------------------
+# CONFIGURATION
+# -------------------------------
+MB = 1024 ** 2
+MULTIPART_THRESHOLD = 8 * MB     # files above this go up in parallel parts
+MULTIPART_CHUNKSIZE = 8 * MB
+MAX_CONCURRENCY = 10             # part uploads per file
+MAX_POOL_CONNECTIONS = 50        # shared by every worker thread
+
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=MULTIPART_CHUNKSIZE,
+    max_concurrency=MAX_CONCURRENCY,
+    use_threads=True,
+)
+CLIENT_CONFIG = Config(max_pool_connections=MAX_POOL_CONNECTIONS, retries={"mode": "adaptive", "max_attempts": 10})
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def shared_client(service, region):
+    """One boto3 client per (service, region), with a connection pool sized for worker threads"""
+    with _clients_lock:
+        if (service, region) not in _clients:
+            _clients[(service, region)] = boto3.client(service, region_name=region, config=CLIENT_CONFIG)
+        return _clients[(service, region)]
+
+
+def s3_etag(file_path, threshold=MULTIPART_THRESHOLD, chunksize=MULTIPART_CHUNKSIZE):
+    """ETag S3 will report for file_path when uploaded with these multipart settings"""
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        if size < threshold:
+            return hashlib.md5(f.read()).hexdigest()
+        digests = [hashlib.md5(chunk).digest() for chunk in iter(lambda: f.read(chunksize), b"")]
+    return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+
+
+def _is_missing(exc):
+    """True for the 404 a HEAD on a missing key raises"""
+    code = getattr(exc, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+class S3Uploader:
+    """upload_file with tuned multipart settings that skips unchanged content
+
+    A local manifest (JSON, optional) remembers size, mtime and ETag of
+    every uploaded file, so unchanged files are skipped without hashing or
+    a HEAD request. Files missing from the manifest are hashed and compared
+    with the ETag of the object already in the bucket.
+    """
+
+    def __init__(self, s3, bucket=None, manifest_path=None, config=TRANSFER_CONFIG):
+        self.s3 = s3
+        self.bucket = bucket
+        self.config = config
+        self.manifest_path = manifest_path
+        self.manifest = {}
+        self._lock = threading.Lock()
+        if manifest_path and os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+    def _save_manifest(self):
+        if not self.manifest_path:
+            return
+        tmp = f"{self.manifest_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+    def _remote_etag(self, bucket, key):
+        try:
+            return self.s3.head_object(Bucket=bucket, Key=key)["ETag"].strip('"')
+        except Exception as exc:
+            if _is_missing(exc):
+                return None
+            raise
+
+    def upload(self, file_path, key, bucket=None):
+        """Upload file_path to s3://bucket/key unless the same content is there; returns True if sent"""
+        bucket = bucket or self.bucket
+        stat = os.stat(file_path)
+        manifest_key = f"{bucket}/{key}"
+        with self._lock:
+            seen = self.manifest.get(manifest_key)
+        if seen and seen["size"] == stat.st_size and seen["mtime"] == stat.st_mtime:
+            return False
+
+        etag = s3_etag(file_path, self.config.multipart_threshold, self.config.multipart_chunksize)
+        uploaded = self._remote_etag(bucket, key) != etag
+        if uploaded:
+            self.s3.upload_file(file_path, bucket, key, Config=self.config)
+
+        with self._lock:
+            self.manifest[manifest_key] = {"size": stat.st_size, "mtime": stat.st_mtime, "etag": etag}
+            self._save_manifest()
+        return uploaded
@@ -0,0 +1,264 @@
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from block_store import BlockStore, write_blocks
+from job_journal import STARTED, SUCCEEDED
+from metrics import Metrics
+from pdf_shards import count_pages, merge_shard_blocks, page_ranges, parse_shard_key, shard_key, split_ranges
+from result_cache import CacheMiss, file_sha256
+from textract_jobs import DONE_STATUSES, estimate_page_count, get_job_blocks
+
+# -------------------------------
+# CONFIGURATION
+# -------------------------------
+MAX_IN_FLIGHT = 8          # documents uploaded / analyzed at the same time
+FEATURE_TYPES = ["TABLES", "FORMS"]
+
+
+def list_pdfs(folder):
+    """Return the PDF filenames in a folder in a stable order"""
+    return sorted(f for f in os.listdir(folder) if f.lower().endswith(".pdf"))
+
+
+class TextractScheduler:
+    """Run upload → start → poll → fetch → parse for many PDFs at once
+
+    Every document is handled by one worker thread, so at most
+    `max_in_flight` Textract jobs are running at any time. The clients are
+    passed in, which lets local_aws.FakeS3 / FakeTextract stand in for AWS.
+    With a result_cache.ResultCache, unchanged PDFs skip S3 and Textract;
+    with an s3_transfer.S3Uploader, PDFs already in the bucket are not re-sent.
+    With `shard_pages`, longer PDFs are split into page ranges that run as
+    separate jobs (still at most `max_in_flight` in total) and are merged
+    back into one block list. With a job_journal.JobJournal, every job's
+    JobId and state is recorded, so a rerun polls jobs that were still
+    running instead of starting them again, and documents whose blocks
+    were saved to `output_path(filename)` are read back from disk.
+    Every stage is timed per document into `metrics` (metrics.Metrics),
+    which also counts API calls, retries, pages and blocks.
+    """
+
+    def __init__(self, s3, textract, bucket, max_in_flight=MAX_IN_FLIGHT,
+                 feature_types=FEATURE_TYPES, notifications=None, cache=None,
+                 uploader=None, shard_pages=None, journal=None, output_path=None,
+                 metrics=None, sleep=time.sleep):
+        self.s3 = s3
+        self.textract = textract
+        self.bucket = bucket
+        self.max_in_flight = max_in_flight
+        self.feature_types = feature_types
+        self.notifications = notifications
+        self.cache = cache
+        self.uploader = uploader
+        self.shard_pages = shard_pages
+        self.journal = journal
+        self.output_path = output_path
+        self.metrics = metrics or Metrics()
+        self.sleep = sleep
+        self._jobs = threading.BoundedSemaphore(max_in_flight)
+
+    def result_features(self):
+        """FeatureTypes the blocks of a document were produced with (part of the cache key)"""
+        return self.feature_types
+
+    def _call(self, operation, **kwargs):
+        """Textract API call, counted (with the retries botocore did) in metrics"""
+        self.metrics.count("api_calls", operation=operation)
+        try:
+            response = getattr(self.textract, operation)(**kwargs)
+        except Exception:
+            self.metrics.count("api_errors", operation=operation)
+            raise
+        retries = response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+        if retries:
+            self.metrics.count("retries", retries, operation=operation)
+        return response
+
+    def upload(self, file_path, key):
+        """Upload PDF to S3"""
+        with self.metrics.span("upload", _document(key)):
+            if self.uploader is not None:
+                sent = self.uploader.upload(file_path, key)
+            else:
+                self.s3.upload_file(file_path, self.bucket, key)
+                sent = True
+        self.metrics.count("uploads", result="sent" if sent else "unchanged")
+
+    def start(self, key, text_only=False):
+        """Start Textract Document Analysis (or plain text detection)"""
+        location = {'S3Object': {'Bucket': self.bucket, 'Name': key}}
+        with self.metrics.span("start", _document(key)):
+            if text_only:
+                response = self._call("start_document_text_detection", DocumentLocation=location)
+            else:
+                response = self._call(
+                    "start_document_analysis",
+                    DocumentLocation=location,
+                    FeatureTypes=self.feature_types
+                )
+        return response["JobId"]
+
+    def fetch(self, job_id, page_count=None, text_only=False, document=None):
+        """Wait for the job and retrieve all of its blocks
+
+        Time until the job reports done is recorded as "wait" (Textract
+        queueing and processing), the NextToken pages after it as "paginate".
+        """
+        operation = "get_document_text_detection" if text_only else "get_document_analysis"
+        started = time.perf_counter()
+        done = [started]
+
+        def on_status(status):
+            if status in DONE_STATUSES:
+                done[0] = time.perf_counter()
+
+        blocks = get_job_blocks(partial(self._call, operation), job_id, page_count=page_count,
+                                notifications=self.notifications, on_status=on_status, sleep=self.sleep)
+        self.metrics.observe("wait", done[0] - started, document)
+        self.metrics.observe("paginate", time.perf_counter() - done[0], document)
+        return blocks
+
+    def _resume(self, journal_key, sha256, page_count, text_only):
+        """Blocks of a journaled job for the same content, or None if it has to run again"""
+        entry = self.journal.get(journal_key)
+        if entry is None or entry["sha256"] != sha256 or not entry["job_id"] \
+                or entry["state"] not in (STARTED, SUCCEEDED):
+            return None
+        try:
+            return self.fetch(entry["job_id"], page_count=page_count, text_only=text_only,
+                              document=_document(journal_key))
+        except Exception as exc:
+            # Textract forgets jobs after a while; anything else is a real failure
+            if getattr(exc, "response", {}).get("Error", {}).get("Code") == "InvalidJobIdException":
+                return None
+            raise
+
+    def analyze(self, file_path, key, page_count=None, sha256=None, text_only=False):
+        """Upload one PDF, run its Textract job and return the blocks"""
+        journal = self.journal if sha256 else None
+        journal_key = f"{key}#text" if text_only else key
+        try:
+            blocks = self._resume(journal_key, sha256, page_count, text_only) if journal else None
+            if blocks is None:
+                self.upload(file_path, key)
+                if journal:
+                    journal.uploaded(journal_key, sha256, key)
+                with self._jobs:
+                    job_id = self.start(key, text_only)
+                    if journal:
+                        journal.started(journal_key, job_id)
+                    blocks = self.fetch(job_id, page_count=page_count, text_only=text_only,
+                                        document=_document(key))
+        except Exception as exc:
+            if journal:
+                journal.failed(journal_key, exc)
+            raise
+        if journal:
+            journal.succeeded(journal_key)
+        return blocks
+
+    def analyze_ranges(self, file_path, key, ranges, sha256=None):
+        """Run each (first, last) page range of a PDF as its own job; returns [(first, blocks)]"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            shards = split_ranges(file_path, ranges, tmp_dir)
+            with ThreadPoolExecutor(max_workers=min(len(shards), self.max_in_flight)) as pool:
+                futures = [(first, pool.submit(self.analyze, path, shard_key(key, first, last),
+                                               last - first + 1, sha256))
+                           for first, last, path in shards]
+                return [(first, future.result()) for first, future in futures]
+
+    def analyze_sharded(self, file_path, key, sha256=None):
+        """Run every page range of a PDF as its own job and merge the blocks"""
+        ranges = page_ranges(count_pages(file_path), self.shard_pages)
+        shards = self.analyze_ranges(file_path, key, ranges, sha256)
+        with self.metrics.span("merge", key):
+            return merge_shard_blocks(shards)
+
+    def run_jobs(self, file_path, filename, sha256=None):
+        """All Textract jobs for one PDF (whole or sharded); returns its blocks"""
+        page_count = estimate_page_count(file_path)
+        if self.shard_pages and page_count > self.shard_pages:
+            return self.analyze_sharded(file_path, filename, sha256)
+        return self.analyze(file_path, filename, page_count, sha256)
+
+    def _saved_blocks(self, filename, sha256):
+        """Blocks a previous run saved for this exact file, or None"""
+        entry = self.journal.get(filename)
+        if entry and entry["sha256"] == sha256 and entry["state"] == SUCCEEDED \
+                and entry["output"] and os.path.exists(entry["output"]):
+            return BlockStore(entry["output"]).to_blocks()
+        return None
+
+    def process(self, folder, filename, parse=None):
+        """Full pipeline for one PDF; returns parse(filename, blocks) or the blocks"""
+        with self.metrics.span("document", filename):
+            return self._process(folder, filename, parse)
+
+    def _process(self, folder, filename, parse):
+        span = self.metrics.span
+        file_path = os.path.join(folder, filename)
+        blocks = sha256 = None
+        source = "saved"
+        if self.journal:
+            with span("hash", filename):
+                sha256 = file_sha256(file_path)
+            with span("load_saved", filename):
+                blocks = self._saved_blocks(filename, sha256)
+        if blocks is None:
+            source = "cache"
+            if self.cache:
+                with span("cache_get", filename):
+                    key = self.cache.key(file_path, self.result_features())
+                    blocks = self.cache.get(key)
+            if blocks is None:
+                if self.cache and self.cache.cache_only:
+                    raise CacheMiss(f"{filename} is not in the result cache")
+                source = "textract"
+                blocks = self.run_jobs(file_path, filename, sha256)
+                if self.cache:
+                    with span("cache_put", filename):
+                        self.cache.put(key, blocks, source=filename)
+            if self.output_path:
+                with span("save", filename):
+                    output = write_blocks(blocks, self.output_path(filename))
+                if self.journal:
+                    self.journal.saved(filename, sha256, output)
+
+        self.metrics.count("documents", source=source)
+        self.metrics.count("blocks", len(blocks))
+        self.metrics.count("pages", max((b.get("Page", 1) for b in blocks), default=0))
+        if not parse:
+            return blocks
+        with span("parse", filename):
+            return parse(filename, blocks)
+
+    def run(self, folder, filenames=None, parse=None):
+        """Process every PDF in folder, yielding (filename, result, error) in filename order
+
+        Documents overlap freely in the worker pool, but results are handed
+        back in the same order as `filenames`, so callers can print reports
+        without interleaving. A failed document yields its exception instead
+        of stopping the rest of the batch.
+        """
+        if filenames is None:
+            filenames = list_pdfs(folder)
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            futures = [(name, pool.submit(self.process, folder, name, parse)) for name in filenames]
+            for name, future in futures:
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    self.metrics.count("failed_documents")
+                    yield name, None, exc
+                else:
+                    yield name, result, None
+
+
+def _document(key):
+    """Document a (possibly shard) S3 key belongs to, for per-document metrics"""
+    shard = parse_shard_key(key)
+    return shard[0] if shard else key
@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from pypdf import PdfWriter
+
+from local_aws import FakeS3, FakeTextract
+from synthetic_corpus import generate_document
+from scheduler import TextractScheduler
+from textract_jobs import InMemoryNotifications
+
+# -------------------------------
+# SHARD SIZE BENCHMARK
+# -------------------------------
+# Runs one long synthetic PDF through TextractScheduler against
+# FakeTextract, whose jobs take `seconds_per_page` per page, once whole and
+# once per shard size, and checks every merged result equals the whole one.
+#
+#   python shard_benchmark.py --pages 300 --shard-pages 25 50 100 150
+#   python shard_benchmark.py --pages 300 --seconds-per-page 0.2 --max-in-flight 4
+
+DEFAULT_SHARD_PAGES = [25, 50, 100, 150]
+
+
+def make_document(folder, pages, name="long.pdf", **corpus):
+    """Blank pages.pdf plus its synthetic saved Textract result in folder"""
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    with open(os.path.join(folder, name), "wb") as f:
+        writer.write(f)
+    with open(os.path.join(folder, f"{name}_textract.json"), "w", encoding="utf-8") as f:
+        f.write(json.dumps(generate_document(pages, seed=pages, **corpus)))
+    return name
+
+
+def run_once(folder, name, shard_pages, seconds_per_page, max_in_flight):
+    """(seconds, blocks, Textract jobs started) for one scheduler run"""
+    notifications = InMemoryNotifications()
+    textract = FakeTextract(folder, polls_before_done=0, seconds_per_page=seconds_per_page,
+                            notifications=notifications)
+    scheduler = TextractScheduler(FakeS3(), textract, "benchmark", max_in_flight=max_in_flight,
+                                  notifications=notifications, shard_pages=shard_pages)
+    started = time.perf_counter()
+    [(_, blocks, error)] = scheduler.run(folder, [name])
+    seconds = time.perf_counter() - started
+    if error is not None:
+        raise error
+    jobs = sum(1 for api, _ in textract.calls if api.startswith("start_"))
+    return seconds, blocks, jobs
+
+
+def run_benchmark(pages, shard_sizes, seconds_per_page, max_in_flight):
+    folder = tempfile.mkdtemp()
+    try:
+        name = make_document(folder, pages)
+        whole_seconds, whole, _ = run_once(folder, name, None, seconds_per_page, max_in_flight)
+        rows = [("whole", 1, whole_seconds, True)]
+        for size in shard_sizes:
+            seconds, blocks, jobs = run_once(folder, name, size, seconds_per_page, max_in_flight)
+            rows.append((size, jobs, seconds, blocks == whole))
+        return rows
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare whole-document and page-range sharded Textract runs")
+    parser.add_argument("--pages", type=int, default=300, help="pages in the synthetic PDF")
+    parser.add_argument("--shard-pages", type=int, nargs="+", default=DEFAULT_SHARD_PAGES, help="shard sizes to try")
+    parser.add_argument("--seconds-per-page", type=float, default=0.05, help="simulated Textract time per page")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="concurrent Textract jobs")
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.pages, args.shard_pages, args.seconds_per_page, args.max_in_flight)
+    whole_seconds = rows[0][2]
+    print(f"{'shard pages':>11} {'jobs':>5} {'seconds':>9} {'speedup':>8} {'same blocks':>12}")
+    for size, jobs, seconds, same in rows:
+        print(f"{size:>11} {jobs:5d} {seconds:9.2f} {whole_seconds / seconds:7.2f}x {'✅' if same else '❌':>11}")
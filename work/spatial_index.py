@@ -0,0 +1,192 @@
+import numpy as np
+
+# -------------------------------
+# SPATIAL INDEX OVER BLOCK GEOMETRY
+# -------------------------------
+# For every (page, BlockType) the BoundingBoxes are kept as an N×4 array of
+# (left, top, right, bottom) and bucketed into a uniform grid over the
+# normalized page, so a proximity query only looks at the blocks in the few
+# grid cells it touches instead of rescanning the page.
+#
+#   index = SpatialIndex.from_blocks(blocks)       # or .from_store(BlockStore)
+#   index.right_of(i)       blocks on the same text row, left to right
+#   index.below(i)          blocks in the same column, top to bottom
+#   index.nearest(page, x, y, k)
+#   index.within(page, (left, top, right, bottom))
+
+SPATIAL_TYPES = ("LINE", "WORD")
+BOXES_PER_CELL = 4      # grid resolution: about this many boxes per cell
+MAX_GRID = 64           # cells per side
+MIN_OVERLAP = 0.5       # share of the smaller box two boxes must overlap to be on the same row / column
+TOLERANCE = 0.002       # slack for boxes that touch or overlap by a hair
+
+
+class PageGrid:
+    """Uniform grid over the boxes of one page (one BlockType)"""
+
+    __slots__ = ("indexes", "boxes", "size", "cell_offsets", "cell_items")
+
+    def __init__(self, indexes, boxes):
+        self.indexes = np.asarray(indexes, np.int64)
+        self.boxes = boxes = np.asarray(boxes, np.float64).reshape(-1, 4)
+        n = len(boxes)
+        self.size = size = int(np.clip(np.sqrt(n / BOXES_PER_CELL), 1, MAX_GRID))
+
+        # every box is listed in each cell it covers (CSR: cell → positions)
+        x0, y0, x1, y1 = (np.clip((boxes[:, k] * size).astype(np.int64), 0, size - 1) for k in range(4))
+        widths = x1 - x0 + 1
+        counts = widths * (y1 - y0 + 1)
+        item = np.repeat(np.arange(n), counts)
+        step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cell = (np.repeat(y0, counts) + step // np.repeat(widths, counts)) * size \
+            + np.repeat(x0, counts) + step % np.repeat(widths, counts)
+        order = np.argsort(cell, kind="stable")
+        self.cell_items = item[order]
+        self.cell_offsets = np.searchsorted(cell[order], np.arange(size * size + 1))
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _cells(self, left, top, right, bottom):
+        """Positions of the boxes listed in the grid cells overlapping a region"""
+        size = self.size
+        x0, x1 = (int(np.clip(v * size, 0, size - 1)) for v in (left, right))
+        y0, y1 = (int(np.clip(v * size, 0, size - 1)) for v in (top, bottom))
+        parts = [self.cell_items[self.cell_offsets[row * size + x0]:self.cell_offsets[row * size + x1 + 1]]
+                 for row in range(y0, y1 + 1)]
+        return np.unique(np.concatenate(parts)) if parts else np.empty(0, np.int64)
+
+    def intersecting(self, region):
+        """Positions of boxes that overlap region (left, top, right, bottom)"""
+        left, top, right, bottom = region
+        pos = self._cells(left, top, right, bottom)
+        b = self.boxes[pos]
+        return pos[(b[:, 0] <= right) & (b[:, 2] >= left) & (b[:, 1] <= bottom) & (b[:, 3] >= top)]
+
+    def within(self, region):
+        """Positions of boxes lying entirely inside region"""
+        left, top, right, bottom = region
+        pos = self._cells(left, top, right, bottom)
+        b = self.boxes[pos]
+        return pos[(b[:, 0] >= left) & (b[:, 2] <= right) & (b[:, 1] >= top) & (b[:, 3] <= bottom)]
+
+    def nearest(self, x, y, k=1):
+        """Positions of the k boxes closest to point (x, y), closest first"""
+        k = min(k, len(self))
+        if not k:
+            return np.empty(0, np.int64)
+        cell = 1.0 / self.size
+        ring = 0
+        while True:
+            # every box within `ring` cells of the point has been looked at,
+            # so nothing further away than ring × cell can be missing
+            reach = ring * cell
+            pos = self._cells(x - reach, y - reach, x + reach, y + reach)
+            if len(pos) >= k:
+                dist = self._distance(pos, x, y)
+                order = np.argsort(dist, kind="stable")[:k]
+                if dist[order[-1]] <= reach or reach >= 1.0:
+                    return pos[order]
+            elif reach >= 1.0:
+                return pos[np.argsort(self._distance(pos, x, y), kind="stable")]
+            ring += 1
+
+    def _distance(self, pos, x, y):
+        b = self.boxes[pos]
+        dx = np.maximum(np.maximum(b[:, 0] - x, x - b[:, 2]), 0)
+        dy = np.maximum(np.maximum(b[:, 1] - y, y - b[:, 3]), 0)
+        return np.hypot(dx, dy)
+
+
+def _overlap(lo, hi, b_lo, b_hi):
+    """Overlap of [lo, hi] with each [b_lo, b_hi] as a share of the shorter interval"""
+    shorter = np.maximum(np.minimum(hi - lo, b_hi - b_lo), 1e-9)
+    return (np.minimum(hi, b_hi) - np.maximum(lo, b_lo)) / shorter
+
+
+class SpatialIndex:
+    """Per-page grids over LINE / WORD boxes with neighbour and region queries
+
+    Results are block indexes (positions in the blocks list, or rows of a
+    BlockStore), the same numbering TextractDocument uses.
+    """
+
+    def __init__(self, page, types, boxes, block_types=SPATIAL_TYPES):
+        # page / types / boxes hold one entry per block; boxes are NaN when a
+        # block has no BoundingBox
+        self.page = np.asarray(page, np.int64)
+        self.types = list(types)
+        self.boxes = np.asarray(boxes, np.float64).reshape(-1, 4)
+        self.block_types = block_types
+        self.grids = {}
+        has_box = ~np.isnan(self.boxes[:, 0])
+        for block_type in block_types:
+            selected = np.array([t == block_type for t in self.types], bool) & has_box
+            indexes = np.nonzero(selected)[0]
+            order = np.argsort(self.page[indexes], kind="stable")
+            indexes = indexes[order]
+            pages, starts = np.unique(self.page[indexes], return_index=True)
+            for page_no, chunk in zip(pages, np.split(indexes, starts[1:])):
+                self.grids[(int(page_no), block_type)] = PageGrid(chunk, self.boxes[chunk])
+
+    @classmethod
+    def from_blocks(cls, blocks, block_types=SPATIAL_TYPES):
+        boxes = np.full((len(blocks), 4), np.nan)
+        for i, block in enumerate(blocks):
+            box = block.get("Geometry", {}).get("BoundingBox")
+            if box:
+                boxes[i] = (box["Left"], box["Top"], box["Left"] + box["Width"], box["Top"] + box["Height"])
+        return cls([b.get("Page", 1) for b in blocks], [b["BlockType"] for b in blocks], boxes, block_types)
+
+    @classmethod
+    def from_store(cls, store, block_types=SPATIAL_TYPES):
+        """Index a block_store.BlockStore straight from its page / type / bbox columns"""
+        names = store.meta["block_types"]
+        bbox = np.asarray(store.bbox, np.float64)
+        boxes = np.column_stack([bbox[:, 0], bbox[:, 1], bbox[:, 0] + bbox[:, 2], bbox[:, 1] + bbox[:, 3]])
+        return cls(store.page[:], [names[c] for c in store.type[:]], boxes, block_types)
+
+    def grid(self, page, block_type="LINE"):
+        return self.grids.get((page, block_type))
+
+    def _query(self, page, block_type, run):
+        grid = self.grid(page, block_type)
+        if grid is None:
+            return []
+        return grid.indexes[run(grid)].tolist()
+
+    def nearest(self, page, x, y, k=1, block_type="LINE"):
+        """Indexes of the k blocks nearest to point (x, y) on a page"""
+        return self._query(page, block_type, lambda g: g.nearest(x, y, k))
+
+    def within(self, page, region, block_type="LINE"):
+        """Indexes of the blocks inside region (left, top, right, bottom), in reading order"""
+        return sorted(self._query(page, block_type, lambda g: g.within(region)))
+
+    def intersecting(self, page, region, block_type="LINE"):
+        """Indexes of the blocks overlapping region, in reading order"""
+        return sorted(self._query(page, block_type, lambda g: g.intersecting(region)))
+
+    def right_of(self, i, max_gap=1.0, block_type="LINE"):
+        """Blocks on the same row as block i and to its right, nearest first"""
+        left, top, right, bottom = self.boxes[i]
+        grid = self.grid(int(self.page[i]), block_type)
+        if grid is None or np.isnan(left):
+            return []
+        pos = grid.intersecting((right - TOLERANCE, top, right + max_gap, bottom))
+        b = grid.boxes[pos]
+        pos = pos[(b[:, 0] >= right - TOLERANCE) & (_overlap(top, bottom, b[:, 1], b[:, 3]) >= MIN_OVERLAP)]
+        pos = pos[np.argsort(grid.boxes[pos, 0], kind="stable")]
+        return [int(j) for j in grid.indexes[pos] if j != i]
+
+    def below(self, i, max_gap=1.0, block_type="LINE"):
+        """Blocks in the same column as block i and under it, nearest first"""
+        left, top, right, bottom = self.boxes[i]
+        grid = self.grid(int(self.page[i]), block_type)
+        if grid is None or np.isnan(left):
+            return []
+        pos = grid.intersecting((left, bottom - TOLERANCE, right, bottom + max_gap))
+        b = grid.boxes[pos]
+        pos = pos[(b[:, 1] >= bottom - TOLERANCE) & (_overlap(left, right, b[:, 0], b[:, 2]) >= MIN_OVERLAP)]
+        pos = pos[np.argsort(grid.boxes[pos, 1], kind="stable")]
+        return [int(j) for j in grid.indexes[pos] if j != i]
@@ -0,0 +1,172 @@
+import json
+import random
+import sys
+import uuid
+
+# -------------------------------
+# SYNTHETIC TEXTRACT CORPUS
+# -------------------------------
+# Builds load-tender-like Textract output of any size: PAGE, LINE, WORD,
+# TABLE, CELL and KEY_VALUE_SET blocks with CHILD / VALUE relationships and
+# BoundingBox + Polygon geometry, in the order get_document_analysis
+# returns them. Same seed, same document.
+
+CITIES = [("Mount Juliet", "TN", "37122"), ("Atlanta", "GA", "30336"), ("Riverview", "FL", "33578"),
+          ("Dallas", "TX", "75201"), ("Columbus", "OH", "43215"), ("Reno", "NV", "89502")]
+COMPANIES = ["Mattress Firm", "Mattress Atlanta", "Blue Grace", "Acme Foods", "Northwind", "Contoso"]
+ITEMS = ["Mattresses", "Box Springs", "Frames", "Pillows", "Pallets"]
+LINE_HEIGHT = 0.012
+
+
+class _Builder:
+    def __init__(self, rng):
+        self.rng = rng
+        self.blocks = []
+
+    def new_id(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def geometry(self, left, top, width, height):
+        return {
+            "BoundingBox": {"Width": width, "Height": height, "Left": left, "Top": top},
+            "Polygon": [
+                {"X": left, "Y": top}, {"X": left + width, "Y": top},
+                {"X": left + width, "Y": top + height}, {"X": left, "Y": top + height},
+            ],
+        }
+
+    def add(self, block_type, page, geometry, **fields):
+        block = {"BlockType": block_type, "Geometry": geometry, "Id": self.new_id(), "Page": page}
+        block["Confidence"] = round(self.rng.uniform(90, 100), 6)
+        block.update(fields)
+        self.blocks.append(block)
+        return block
+
+    def words(self, text, page, left, top):
+        """WORD blocks for text laid out from (left, top); returns their Ids"""
+        ids = []
+        x = left
+        for word in text.split():
+            width = 0.007 * len(word)
+            ids.append(self.add("WORD", page, self.geometry(x, top, width, LINE_HEIGHT),
+                                Text=word, TextType="PRINTED")["Id"])
+            x += width + 0.005
+        return ids
+
+    def line(self, text, page, left, top):
+        width = min(0.9, 0.0075 * len(text))
+        line = self.add("LINE", page, self.geometry(left, top, width, LINE_HEIGHT), Text=text)
+        line["Relationships"] = [{"Type": "CHILD", "Ids": []}]
+        line["Relationships"][0]["Ids"] = self.words(text, page, left, top)
+        return line
+
+
+def stop_lines(rng, number):
+    company = rng.choice(COMPANIES)
+    city, state, zipcode = rng.choice(CITIES)
+    day = rng.randint(1, 28)
+    kind = "pickup" if number == 1 else "drop"
+    return [
+        f"Stop {number} ({kind})",
+        f"09/{day:02d}/2025 09:00AM - 09/{day:02d}/2025 09:00PM",
+        f"Shipping, ({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}",
+        f"{company}, {rng.randint(10, 99999)} Volunteer Blvd Door {rng.randint(1, 60)}, {city}, {state}",
+        zipcode,
+        "Comments:",
+        "Items",
+        "HM", "Description", "Weight", "Qty", "Dimensions",
+        rng.choice(ITEMS), str(rng.randint(100, 40000)), str(rng.randint(1, 500)),
+    ]
+
+
+def page_lines(rng, page, stops_per_page):
+    lines = [str(rng.randint(100000, 999999)), "Carrier Load Tender",
+             f"Reference: BG{rng.randint(10 ** 9, 10 ** 10 - 1)} Tender: 09/19/2025 02:44PM"]
+    if page == 1:
+        lines += ["Special Instructions",
+                  "SWAP TRAILER AND DROP EMPTY TRAILER IN SAME DOOR YOU PULL THE FULL TRAILER",
+                  "Equipment & Services", "Dry Van", "Temperature: Minimum:", "0.00"]
+    for s in range(stops_per_page):
+        lines += stop_lines(rng, (page - 1) * stops_per_page + s + 1)
+    lines += ["Freight Terms", "Charge Details", "Description", "Rate", "Charge", "Line Haul",
+              f"{rng.uniform(300, 3000):.4f} Flat Rate (FR)", f"${rng.uniform(300, 3000):.2f}", "Fuel",
+              f"{rng.uniform(0.1, 1):.4f} Per Mile (PM)", f"${rng.uniform(50, 500):.2f}"]
+    return lines
+
+
+def terms_lines(rng):
+    """A page of plain terms-and-conditions text: no stops, tables or forms"""
+    words = ["carrier", "shall", "deliver", "the", "shipment", "within", "agreed", "time", "and", "broker",
+             "invoice", "payment", "terms", "apply", "to", "all", "loads", "under", "this", "agreement"]
+    return ["Terms and Conditions"] + [" ".join(rng.choice(words) for _ in range(12)) for _ in range(40)]
+
+
+def generate_document(pages=1, seed=0, stops_per_page=2, table_rows=5, table_every=1):
+    """Textract blocks for a synthetic multi-page load tender
+
+    Only every `table_every`-th page (1, 1 + table_every, ...) carries stops,
+    a table and form fields; the pages in between are plain text.
+    """
+    rng = random.Random(seed)
+    b = _Builder(rng)
+    for page in range(1, pages + 1):
+        page_block = b.add("PAGE", page, b.geometry(0.0, 0.0, 1.0, 1.0))
+        page_block.pop("Confidence")
+        children = []
+
+        if (page - 1) % table_every:
+            top = 0.02
+            for text in terms_lines(rng):
+                children.append(b.line(text, page, 0.05, top)["Id"])
+                top += LINE_HEIGHT * 1.1
+            page_block["Relationships"] = [{"Type": "CHILD", "Ids": children}]
+            continue
+
+        top = 0.02
+        for text in page_lines(rng, page, stops_per_page):
+            children.append(b.line(text, page, 0.05, top)["Id"])
+            top += LINE_HEIGHT * 1.1
+
+        # a charges table: header row + table_rows data rows, 3 columns
+        table = b.add("TABLE", page, b.geometry(0.05, top, 0.9, LINE_HEIGHT * (table_rows + 1)),
+                      EntityTypes=["STRUCTURED_TABLE"])
+        cell_ids = []
+        for row in range(1, table_rows + 2):
+            for col in range(1, 4):
+                text = ["Description", "Rate", "Charge"][col - 1] if row == 1 else \
+                    [rng.choice(ITEMS), f"{rng.uniform(0, 10):.4f}", f"${rng.uniform(0, 900):.2f}"][col - 1]
+                left, cell_top = 0.05 + 0.3 * (col - 1), top + LINE_HEIGHT * (row - 1)
+                cell = b.add("CELL", page, b.geometry(left, cell_top, 0.3, LINE_HEIGHT),
+                             RowIndex=row, ColumnIndex=col, RowSpan=1, ColumnSpan=1)
+                cell["Relationships"] = [{"Type": "CHILD", "Ids": b.words(text, page, left, cell_top)}]
+                if row == 1:
+                    cell["EntityTypes"] = ["COLUMN_HEADER"]
+                cell_ids.append(cell["Id"])
+        table["Relationships"] = [{"Type": "CHILD", "Ids": cell_ids}]
+        children.append(table["Id"])
+        top += LINE_HEIGHT * (table_rows + 2)
+
+        # form fields
+        for key, value in (("Mode", "TL"), ("PO Number", f"PO-{rng.randint(100, 999)}"),
+                           ("Weight", str(rng.randint(1000, 40000)))):
+            value_block = b.add("KEY_VALUE_SET", page, b.geometry(0.4, top, 0.2, LINE_HEIGHT),
+                                EntityTypes=["VALUE"])
+            value_block["Relationships"] = [{"Type": "CHILD", "Ids": b.words(value, page, 0.4, top)}]
+            key_block = b.add("KEY_VALUE_SET", page, b.geometry(0.05, top, 0.2, LINE_HEIGHT),
+                              EntityTypes=["KEY"])
+            key_block["Relationships"] = [
+                {"Type": "VALUE", "Ids": [value_block["Id"]]},
+                {"Type": "CHILD", "Ids": b.words(key, page, 0.05, top)},
+            ]
+            top += LINE_HEIGHT * 1.1
+
+        page_block["Relationships"] = [{"Type": "CHILD", "Ids": children}]
+    return b.blocks
+
+
+if __name__ == "__main__":
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    out = sys.argv[2] if len(sys.argv) > 2 else f"synthetic_{pages}p_textract.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(generate_document(pages), f)
+    print(f"💾 Saved {pages}-page synthetic Textract result to '{out}'")
@@ -0,0 +1,166 @@
+import re
+
+from anchors import AnchorIndex
+
+# -------------------------------
+# DECLARATIVE EXTRACTION TEMPLATES
+# -------------------------------
+# A layout is plain data (see layouts.py):
+#
+#   {
+#     "name": "...",
+#     "fingerprint": [keywords that identify the layout],
+#     "sections": [{"name", "between": [start_anchor, end_anchor]}],
+#     "groups":   [{"name", "repeat": anchor, "requires": n, "limit": n,
+#                   "unique": bool, "fields": [...]}],
+#   }
+#
+# A group yields one item per line containing its "repeat" anchor (lines
+# with repeated text are skipped unless "unique" is false, at most "limit"
+# items). Fields are only filled when `requires` more lines follow.
+# A field reads the line at `offset` from its base line: the group's anchor
+# line or, with "from", the next line strictly after it containing another
+# anchor.
+# Optional "regex" keeps the first match ("default": "line" falls back to
+# the raw line), "number": true keeps the first number, and "split": ","
+# returns the non-empty stripped parts.
+#
+# compile_template turns a layout into an ExtractionPlan once; plan.run is
+# then a tight loop over the anchor positions of each document.
+
+NUMBER = re.compile(r"\d+(\.\d+)?")
+
+
+def _compile_field(spec):
+    """Turn a field spec into a function (lines, hits, base) -> value"""
+    offset = spec.get("offset", 0)
+    start_from = spec.get("from")
+    regex = re.compile(spec["regex"]) if "regex" in spec else (NUMBER if spec.get("number") else None)
+    default_line = spec.get("default") == "line"
+    split = spec.get("split")
+
+    def extract(lines, hits, base):
+        if start_from is not None:
+            base = hits.next_at_or_after(start_from, base + 1)
+            if base is None:
+                return None
+        i = base + offset
+        if not 0 <= i < len(lines):
+            return None
+        line = lines[i]
+        if regex is not None:
+            match = regex.search(line)
+            if match:
+                return match.group(0)
+            return line if default_line else None
+        if split is not None:
+            return [part.strip() for part in line.split(split) if part.strip()]
+        return line
+    return spec["name"], extract
+
+
+class ExtractionPlan:
+    """A compiled layout: anchor positions in, structured record out"""
+
+    def __init__(self, spec):
+        self.name = spec["name"]
+        self.fingerprint = list(spec.get("fingerprint", []))
+        self.sections = [(s["name"], s["between"][0], s["between"][1]) for s in spec.get("sections", [])]
+        self.groups = [
+            (g["name"], g["repeat"], g.get("requires", 0), g.get("limit"), g.get("unique", True),
+             [_compile_field(f) for f in g["fields"]])
+            for g in spec.get("groups", [])
+        ]
+        self.case_sensitive = set(spec.get("case_sensitive", []))
+        self.anchors = {f["from"] for g in spec.get("groups", []) for f in g["fields"] if "from" in f}
+        self.anchors.update(g["repeat"] for g in spec.get("groups", []))
+        for _, start, end in self.sections:
+            self.anchors.update((start, end))
+        self._index = None
+
+    def run(self, lines, hits=None):
+        """Extract one document's record; hits may come from a shared scan"""
+        if hits is None:
+            if self._index is None:
+                self._index = AnchorIndex(sorted(self.anchors), case_sensitive=self.case_sensitive)
+            hits = self._index.scan(lines)
+        n = len(lines)
+        record = {"template": self.name}
+
+        for name, start, end in self.sections:
+            span = hits.span(start, end)
+            record[name] = lines[span[0] + 1:span[1]] if span else None
+
+        for name, repeat, requires, limit, unique, fields in self.groups:
+            items = []
+            seen = set()
+            for idx in hits.all(repeat):
+                if limit is not None and len(items) >= limit:
+                    break
+                if unique:
+                    if lines[idx] in seen:
+                        continue
+                    seen.add(lines[idx])
+                item = {"anchor": lines[idx], "line": idx}
+                if idx + requires < n:
+                    for field_name, extract in fields:
+                        item[field_name] = extract(lines, hits, idx)
+                items.append(item)
+            record[name] = items
+
+        return record
+
+
+def compile_template(spec):
+    """Compile a layout spec into an ExtractionPlan"""
+    return ExtractionPlan(spec)
+
+
+class TemplateSet:
+    """Several layouts sharing one anchor scan, picked by fingerprint
+
+    Every anchor and fingerprint keyword of every layout goes into a single
+    AnchorIndex, so a document is scanned once. The layout whose fingerprint
+    keywords are all present (most keywords wins) is then run on those hits;
+    documents matching no fingerprint use the `default` layout, if any.
+    """
+
+    def __init__(self, specs, default=None):
+        self.plans = [compile_template(spec) for spec in specs]
+        self.default = next((plan for plan in self.plans if plan.name == default), None)
+        keywords = set()
+        case_sensitive = set()
+        for plan in self.plans:
+            keywords.update(plan.anchors)
+            keywords.update(plan.fingerprint)
+            case_sensitive.update(plan.case_sensitive)
+        self.index = AnchorIndex(sorted(keywords), case_sensitive=case_sensitive)
+        bit = {keyword: 1 << i for i, keyword in enumerate(self.index.keywords)}
+        self.bit = bit
+        # most specific fingerprints are tried first
+        self.masks = sorted(
+            ((sum(bit[k] for k in set(plan.fingerprint)), plan) for plan in self.plans),
+            key=lambda item: -bin(item[0]).count("1"),
+        )
+
+    def match(self, hits):
+        """Plan whose fingerprint is fully present in hits, else the default"""
+        present = 0
+        for keyword, positions in hits.positions.items():
+            if positions:
+                present |= self.bit[keyword]
+        for mask, plan in self.masks:
+            if present & mask == mask:
+                return plan
+        return self.default
+
+    def run(self, lines):
+        """Extract a record with the matching layout; None if no layout applies"""
+        hits = self.index.scan(lines)
+        plan = self.match(hits)
+        return plan.run(lines, hits) if plan else None
+
+    def run_many(self, documents):
+        """Yield (name, record) for an iterable of (name, lines)"""
+        for name, lines in documents:
+            yield name, self.run(lines)
@@ -0,0 +1,191 @@
+from array import array
+
+from spatial_index import SpatialIndex
+
+# -------------------------------
+# INDEXED TEXTRACT DOCUMENT
+# -------------------------------
+# Built once per job: every lookup afterwards (block by Id, children,
+# parent, blocks of a page or type, table cell, key → value) is a dict or
+# array access instead of a scan over all blocks. Geometry lookups ("the
+# value right of Freight Terms") go through a lazily built SpatialIndex.
+
+
+class Table:
+    """Dense (row, col) grid of CELL indexes for one TABLE block"""
+
+    __slots__ = ("doc", "index", "rows", "cols", "grid")
+
+    def __init__(self, doc, index, cells):
+        self.doc = doc
+        self.index = index
+        blocks = doc.blocks
+        self.rows = max((blocks[c].get("RowIndex", 0) + blocks[c].get("RowSpan", 1) - 1 for c in cells), default=0)
+        self.cols = max((blocks[c].get("ColumnIndex", 0) + blocks[c].get("ColumnSpan", 1) - 1 for c in cells), default=0)
+        self.grid = array("l", [-1]) * (self.rows * self.cols)
+        for c in cells:
+            block = blocks[c]
+            row, col = block.get("RowIndex", 0), block.get("ColumnIndex", 0)
+            if not row or not col:
+                continue
+            # merged cells cover every grid slot they span
+            for r in range(row, row + block.get("RowSpan", 1)):
+                for k in range(col, col + block.get("ColumnSpan", 1)):
+                    self.grid[(r - 1) * self.cols + (k - 1)] = c
+
+    def cell(self, row, col):
+        """Block index of the cell at 1-based (row, col), or -1"""
+        if not (1 <= row <= self.rows and 1 <= col <= self.cols):
+            return -1
+        return self.grid[(row - 1) * self.cols + (col - 1)]
+
+    def text(self, row, col):
+        """Text of the cell at 1-based (row, col), or None"""
+        c = self.cell(row, col)
+        return self.doc.text(c) if c >= 0 else None
+
+    def to_rows(self):
+        """All cell texts as a list of rows"""
+        return [[self.text(r, c) for c in range(1, self.cols + 1)] for r in range(1, self.rows + 1)]
+
+
+class TextractDocument:
+    """Textract blocks plus Id / relationship / page / type / table indexes"""
+
+    __slots__ = (
+        "blocks", "ids", "parent", "child_offsets", "child_index", "value_of",
+        "by_page", "by_type", "by_page_type", "tables", "_texts", "_key_values",
+        "_spatial", "_labels",
+    )
+
+    def __init__(self, blocks):
+        self.blocks = blocks = list(blocks)
+        n = len(blocks)
+        self.ids = {block["Id"]: i for i, block in enumerate(blocks)}
+        self.parent = array("l", [-1]) * n
+        self.value_of = array("l", [-1]) * n
+        self.child_offsets = array("l", [0]) * (n + 1)
+        self.child_index = array("l")
+        by_page, by_type, by_page_type = {}, {}, {}
+
+        for i, block in enumerate(blocks):
+            by_page.setdefault(block.get("Page", 1), array("l")).append(i)
+            by_type.setdefault(block["BlockType"], array("l")).append(i)
+            by_page_type.setdefault((block.get("Page", 1), block["BlockType"]), array("l")).append(i)
+            for rel in block.get("Relationships", []):
+                if rel["Type"] == "CHILD":
+                    for child_id in rel["Ids"]:
+                        c = self.ids.get(child_id)
+                        if c is not None:
+                            self.child_index.append(c)
+                            if self.parent[c] < 0:
+                                self.parent[c] = i
+                elif rel["Type"] == "VALUE":
+                    for value_id in rel["Ids"]:
+                        v = self.ids.get(value_id)
+                        if v is not None:
+                            self.value_of[i] = v
+            self.child_offsets[i + 1] = len(self.child_index)
+
+        self.by_page = by_page
+        self.by_type = by_type
+        self.by_page_type = by_page_type
+        self._texts = [None] * n
+        self._key_values = None
+        self._spatial = None
+        self._labels = None
+        self.tables = [
+            Table(self, t, [c for c in self.children(t) if blocks[c]["BlockType"] in ("CELL", "MERGED_CELL")])
+            for t in by_type.get("TABLE", ())
+        ]
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def index_of(self, block_id):
+        return self.ids[block_id]
+
+    def block(self, block_id):
+        """Block dict by Textract Id"""
+        return self.blocks[self.ids[block_id]]
+
+    def children(self, i):
+        """Indexes of the CHILD blocks of block i"""
+        return self.child_index[self.child_offsets[i]:self.child_offsets[i + 1]]
+
+    def page_blocks(self, page, block_type=None):
+        """Indexes of the blocks on a page, optionally of one BlockType"""
+        if block_type is None:
+            return self.by_page.get(page, array("l"))
+        return self.by_page_type.get((page, block_type), array("l"))
+
+    def of_type(self, block_type):
+        """Indexes of every block of a BlockType, in document order"""
+        return self.by_type.get(block_type, array("l"))
+
+    def lines(self):
+        return [self.blocks[i]["Text"] for i in self.of_type("LINE") if "Text" in self.blocks[i]]
+
+    def text(self, i):
+        """Block text: its own Text, or its WORD children joined by spaces"""
+        cached = self._texts[i]
+        if cached is None:
+            block = self.blocks[i]
+            if "Text" in block:
+                cached = block["Text"]
+            else:
+                cached = " ".join(
+                    self.blocks[c]["Text"] for c in self.children(i) if "Text" in self.blocks[c]
+                )
+            self._texts[i] = cached
+        return cached
+
+    def key_values(self):
+        """Form fields as {key text: value text}; first occurrence wins"""
+        if self._key_values is None:
+            pairs = {}
+            for i in self.of_type("KEY_VALUE_SET"):
+                if "KEY" in self.blocks[i].get("EntityTypes", ()) and self.value_of[i] >= 0:
+                    pairs.setdefault(self.text(i), self.text(self.value_of[i]))
+            self._key_values = pairs
+        return self._key_values
+
+    def value(self, key, default=None):
+        """Value text for a form key (exact key text, trailing ':' ignored)"""
+        pairs = self.key_values()
+        if key in pairs:
+            return pairs[key]
+        return pairs.get(key.rstrip(":") + ":", pairs.get(key.rstrip(":"), default))
+
+    def cell_text(self, table, row, col):
+        """Text at 1-based (row, col) of the table-th table (0-based)"""
+        return self.tables[table].text(row, col)
+
+    def spatial(self):
+        """SpatialIndex over the LINE / WORD boxes, built on first use"""
+        if self._spatial is None:
+            self._spatial = SpatialIndex.from_blocks(self.blocks)
+        return self._spatial
+
+    def labels(self, label, page=None):
+        """Indexes of the LINEs reading `label` (case and trailing ':' ignored)"""
+        if self._labels is None:
+            labels = {}
+            for i in self.of_type("LINE"):
+                labels.setdefault(_label(self.text(i)), array("l")).append(i)
+            self._labels = labels
+        found = self._labels.get(_label(label), array("l"))
+        return [i for i in found if page is None or self.blocks[i].get("Page", 1) == page]
+
+    def value_near(self, label, page=None):
+        """Text of the LINE right of a label line, else the one under it; None if neither"""
+        index = self.spatial()
+        for i in self.labels(label, page):
+            neighbours = index.right_of(i) or index.below(i)
+            if neighbours:
+                return self.text(neighbours[0])
+        return None
+
+
+def _label(text):
+    return text.strip().rstrip(":").strip().casefold()
@@ -0,0 +1,158 @@
+import json
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# -------------------------------
+# CONFIGURATION
+# -------------------------------
+FIRST_POLL_MIN = 1.0        # seconds before the first status check
+FIRST_POLL_PER_PAGE = 0.5   # extra seconds per page before the first check
+POLL_MAX = 30.0             # longest gap between two status checks
+BACKOFF_FACTOR = 1.6
+MAX_PENDING_NOTIFICATIONS = 10000   # published statuses nobody waited for; the oldest are dropped
+
+DONE_STATUSES = ("SUCCEEDED", "PARTIAL_SUCCESS")
+
+
+class TextractJobFailed(Exception):
+    """Raised when a Textract job ends in FAILED"""
+
+
+def estimate_page_count(pdf_path):
+    """Count page objects in a PDF without parsing it (good enough to seed polling)"""
+    with open(pdf_path, "rb") as f:
+        data = f.read()
+    return len(re.findall(rb"/Type\s*/Page(?![a-zA-Z])", data)) or 1
+
+
+def poll_delays(page_count=None, rng=random):
+    """Yield wait times: first one scaled by page count, then exponential with jitter"""
+    first = FIRST_POLL_MIN + FIRST_POLL_PER_PAGE * (page_count or 1)
+    delay = min(first, POLL_MAX)
+    while True:
+        # "equal jitter": never less than half the delay, so jobs started
+        # together don't keep hitting the API in lockstep
+        yield delay / 2 + rng.uniform(0, delay / 2)
+        delay = min(delay * BACKOFF_FACTOR, POLL_MAX)
+
+
+def iter_job_blocks(get_page, job_id, page_count=None, notifications=None,
+                    on_status=None, sleep=time.sleep):
+    """Wait for a Textract job and yield its blocks one result page at a time
+
+    get_page is textract.get_document_analysis or get_document_text_detection.
+    The SUCCEEDED response already holds the first page of blocks, so it is
+    kept and only the NextToken pages are requested afterwards.
+    When `notifications` is given (InMemoryNotifications / SqsNotifications)
+    the wait between polls ends as soon as the job's completion is published.
+    """
+    delays = poll_delays(page_count)
+    while True:
+        result = get_page(JobId=job_id)
+        status = result["JobStatus"]
+        if on_status:
+            on_status(status)
+        if status in DONE_STATUSES or status == "FAILED":
+            if notifications is not None:
+                notifications.forget(job_id)
+        if status in DONE_STATUSES:
+            break
+        if status == "FAILED":
+            raise TextractJobFailed(f"Textract job {job_id} failed: {result.get('StatusMessage', status)}")
+        delay = next(delays)
+        if notifications is not None:
+            notifications.wait(job_id, delay)
+        else:
+            sleep(delay)
+
+    while True:
+        yield from result["Blocks"]
+        next_token = result.get("NextToken")
+        if not next_token:
+            break
+        result = get_page(JobId=job_id, NextToken=next_token)
+
+
+def get_job_blocks(get_page, job_id, **kwargs):
+    """Wait for a Textract job and return all of its blocks as a list"""
+    return list(iter_job_blocks(get_page, job_id, **kwargs))
+
+# -------------------------------
+# COMPLETION NOTIFICATIONS
+# -------------------------------
+
+
+class InMemoryNotifications:
+    """Local completion channel: publish(job_id, status) wakes wait(job_id)
+
+    A published status is handed to one wait() and then removed, so if the
+    status API still lags behind the notification, the next wait() sleeps
+    its full timeout instead of returning at once.
+    """
+
+    def __init__(self):
+        self._statuses = OrderedDict()
+        self._cond = threading.Condition()
+
+    def publish(self, job_id, status):
+        with self._cond:
+            self._statuses[job_id] = status
+            if len(self._statuses) > MAX_PENDING_NOTIFICATIONS:
+                self._statuses.popitem(last=False)
+            self._cond.notify_all()
+
+    def wait(self, job_id, timeout):
+        """Block until job_id is published or timeout passes; return its status or None"""
+        with self._cond:
+            self._cond.wait_for(lambda: job_id in self._statuses, timeout)
+            return self._statuses.pop(job_id, None)
+
+    def forget(self, job_id):
+        """Drop a status no one will wait for (the job was seen finished by polling)"""
+        with self._cond:
+            self._statuses.pop(job_id, None)
+
+
+class SqsNotifications(InMemoryNotifications):
+    """Completion channel fed by the SNS → SQS topic set in NotificationChannel
+
+    One waiter at a time long-polls the queue; messages for other jobs are
+    remembered so their waiters return on their next check.
+    """
+
+    def __init__(self, sqs, queue_url):
+        super().__init__()
+        self.sqs = sqs
+        self.queue_url = queue_url
+        self._receiving = threading.Lock()
+
+    def wait(self, job_id, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if job_id in self._statuses:
+                    return self._statuses.pop(job_id)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if not self._receiving.acquire(blocking=False):
+                # someone else is reading the queue; wait for what they publish
+                return super().wait(job_id, remaining)
+            try:
+                self._receive(min(20, max(1, int(remaining))))
+            finally:
+                self._receiving.release()
+
+    def _receive(self, wait_seconds):
+        response = self.sqs.receive_message(
+            QueueUrl=self.queue_url, MaxNumberOfMessages=10, WaitTimeSeconds=wait_seconds
+        )
+        for message in response.get("Messages", []):
+            body = json.loads(message["Body"])
+            # SNS wraps the Textract payload in a "Message" string
+            payload = json.loads(body["Message"]) if "Message" in body else body
+            self.publish(payload["JobId"], payload["Status"])
+            self.sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=message["ReceiptHandle"])
@@ -0,0 +1,144 @@
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+
+from anchors import AnchorIndex
+from pdf_shards import merge_shard_blocks, page_ranges, page_runs
+from scheduler import TextractScheduler
+from textract_jobs import estimate_page_count
+
+# -------------------------------
+# TIERED ANALYSIS: TEXT DETECTION FIRST, TABLES/FORMS WHERE NEEDED
+# -------------------------------
+# Text detection is faster and cheaper than TABLES/FORMS analysis. The
+# tiered scheduler runs it over the whole PDF, looks for the anchor
+# keywords that introduce tables and form fields, and runs the full
+# analysis only on the page ranges they occur on. The analysis blocks of
+# those pages replace their text-only blocks in the merged result.
+#
+#   python tiered_analysis.py --pages 60 --table-every 6   # latency of both strategies
+
+ANALYSIS_ANCHORS = ["Items", "freight terms", "charge details", "reference type"]
+CASE_SENSITIVE = ["Items"]
+
+
+def pages_with_anchors(blocks, anchors):
+    """Pages whose LINE blocks contain any keyword of an AnchorIndex"""
+    pages = set()
+    for block in blocks:
+        if block["BlockType"] == "LINE" and anchors.find(block.get("Text", "")):
+            pages.add(block.get("Page", 1))
+    return pages
+
+
+class TieredScheduler(TextractScheduler):
+    """TextractScheduler that plans TABLES/FORMS analysis from a text detection pass
+
+    `timings[filename]` holds the pages analyzed and the seconds spent in
+    each tier for every document processed.
+    """
+
+    def __init__(self, *args, anchors=ANALYSIS_ANCHORS, case_sensitive=CASE_SENSITIVE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.anchors = AnchorIndex(anchors, case_sensitive)
+        self.timings = {}
+        self._timings_lock = threading.Lock()
+
+    def result_features(self):
+        return [*self.feature_types, "TIERED"]
+
+    def plan(self, text_blocks):
+        """(first, last) page ranges to analyze with TABLES/FORMS"""
+        ranges = []
+        for first, last in page_runs(pages_with_anchors(text_blocks, self.anchors)):
+            if self.shard_pages:
+                ranges += [(first + a - 1, first + b - 1) for a, b in page_ranges(last - first + 1, self.shard_pages)]
+            else:
+                ranges.append((first, last))
+        return ranges
+
+    def run_jobs(self, file_path, filename, sha256=None):
+        started = time.perf_counter()
+        page_count = estimate_page_count(file_path)
+        text_blocks = self.analyze(file_path, filename, page_count, sha256, text_only=True)
+        detected = time.perf_counter()
+
+        ranges = self.plan(text_blocks)
+        pages = max((b.get("Page", 1) for b in text_blocks), default=0)
+        if ranges == [(1, pages)]:
+            blocks = self.analyze(file_path, filename, page_count, sha256)
+        elif ranges:
+            analyzed = {p for first, last in ranges for p in range(first, last + 1)}
+            plain = [b for b in text_blocks if b.get("Page", 1) not in analyzed]
+            blocks = merge_shard_blocks([(1, plain)] + self.analyze_ranges(file_path, filename, ranges, sha256))
+        else:
+            blocks = text_blocks
+
+        finished = time.perf_counter()
+        analyzed_pages = sum(last - first + 1 for first, last in ranges)
+        self.metrics.observe("text_tier", detected - started, filename)
+        self.metrics.observe("analysis_tier", finished - detected, filename)
+        self.metrics.count("analyzed_pages", analyzed_pages)
+        with self._timings_lock:
+            self.timings[filename] = {
+                "pages": pages,
+                "analyzed_pages": analyzed_pages,
+                "text_seconds": detected - started,
+                "analysis_seconds": finished - detected,
+                "seconds": finished - started,
+            }
+        return blocks
+
+
+def compare(folder, filenames, make_textract, **scheduler_kwargs):
+    """End-to-end seconds and pages analyzed for full analysis vs the tiered plan
+
+    make_textract() returns a fresh client (e.g. a FakeTextract) per strategy.
+    """
+    from local_aws import FakeS3
+
+    report = {}
+    for name, cls in (("full", TextractScheduler), ("tiered", TieredScheduler)):
+        scheduler = cls(FakeS3(), make_textract(), "compare", **scheduler_kwargs)
+        started = time.perf_counter()
+        results = {filename: blocks for filename, blocks, error in scheduler.run(folder, filenames)}
+        report[name] = {"seconds": time.perf_counter() - started, "results": results,
+                        "timings": getattr(scheduler, "timings", None)}
+    return report
+
+
+if __name__ == "__main__":
+    from local_aws import FakeTextract
+    from pipeline import extract_lines
+    from shard_benchmark import make_document
+    from textract_jobs import InMemoryNotifications
+
+    parser = argparse.ArgumentParser(description="Compare full TABLES/FORMS analysis with the tiered plan")
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--table-every", type=int, default=6, help="every n-th page has tables and forms")
+    parser.add_argument("--seconds-per-page", type=float, default=0.05, help="simulated analysis time per page")
+    parser.add_argument("--text-seconds-per-page", type=float, default=0.01, help="simulated text detection time")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    try:
+        name = make_document(folder, args.pages, table_every=args.table_every)
+        notifications = InMemoryNotifications()
+        report = compare(
+            folder, [name],
+            lambda: FakeTextract(folder, polls_before_done=0, seconds_per_page=args.seconds_per_page,
+                                 text_seconds_per_page=args.text_seconds_per_page, notifications=notifications),
+            notifications=notifications,
+        )
+    finally:
+        shutil.rmtree(folder)
+
+    full, tiered = report["full"], report["tiered"]
+    timing = tiered["timings"][name]
+    print(f"full analysis : {full['seconds']:7.2f}s  ({args.pages} pages with TABLES/FORMS)")
+    print(f"tiered        : {tiered['seconds']:7.2f}s  ({timing['analyzed_pages']} pages with TABLES/FORMS; "
+          f"text {timing['text_seconds']:.2f}s + analysis {timing['analysis_seconds']:.2f}s)")
+    same = extract_lines(full["results"][name]) == extract_lines(tiered["results"][name])
+    print(f"same LINE text: {'✅' if same else '❌'}")
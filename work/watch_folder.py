@@ -0,0 +1,359 @@
+import argparse
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import shutil
+import signal
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+# -------------------------------
+# WATCH-FOLDER DAEMON
+# -------------------------------
+# Instead of sweeping LOCAL_FOLDER from cron, FolderWatcher keeps running:
+# new or changed PDFs are picked up as soon as they have finished being
+# written and go through a bounded queue to worker threads that run
+# TextractScheduler.process on them. On Linux the folder is watched with
+# inotify; elsewhere (or if inotify is unavailable) it is rescanned every
+# `poll_interval` seconds.
+#
+#   watcher = FolderWatcher(scheduler, LOCAL_FOLDER, parse=analyze_document, on_result=report)
+#   watcher.run_forever()          # until SIGINT / SIGTERM
+#
+#   python watch_folder.py --documents 20      # local check with FakeS3 / FakeTextract
+
+QUEUE_SIZE = 32            # documents waiting for a worker before the watcher pauses
+SETTLE_SECONDS = 2.0       # a file must keep its size and mtime this long before it is processed
+POLL_INTERVAL = 2.0        # seconds between rescans without inotify
+
+# inotify(7) event bits
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT = struct.Struct("iIII")   # wd, mask, cookie, len; the name follows
+
+
+def _is_pdf(name):
+    return name.lower().endswith(".pdf")
+
+
+class Inotify:
+    """Minimal inotify watch on one directory, through libc (no extra package)
+
+    Raises OSError when inotify is not available.
+    """
+
+    def __init__(self, folder):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {folder}")
+
+    def read(self, timeout):
+        """Names of the files touched within `timeout` seconds; None means "rescan everything"
+
+        (the kernel queue overflowed and events were lost)
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        names = set()
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            if mask & IN_Q_OVERFLOW:
+                return None
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if name:
+                names.add(name)
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FolderWatcher:
+    """Process PDFs as they appear or change in a folder, until stopped
+
+    One watcher thread turns folder events (or rescans) into work items;
+    `workers` threads (default: the scheduler's max_in_flight) take them
+    from a queue of at most `queue_size` documents, so a burst of new files
+    pauses the watcher instead of piling up in memory.
+
+    A file is only queued once its size and mtime have not changed for
+    `settle` seconds, so PDFs that are still being copied in are not sent
+    half written. A file that changes again after it was processed is
+    processed again; one that changes while it is queued or running is
+    picked up once that run finishes.
+
+    on_result(filename, result, error) is called from the workers, one call
+    at a time, with what scheduler.process returned or raised. stop() lets
+    every running document finish; documents still queued are dropped
+    unless drain=True, and are found again by the initial scan of the next
+    start (a job_journal.JobJournal on the scheduler makes that cheap for
+    anything that did finish, and resumes Textract jobs a crash interrupted).
+    """
+
+    def __init__(self, scheduler, folder, parse=None, on_result=None, workers=None,
+                 queue_size=QUEUE_SIZE, settle=SETTLE_SECONDS, poll_interval=POLL_INTERVAL,
+                 use_inotify=True):
+        self.scheduler = scheduler
+        self.folder = folder
+        self.parse = parse
+        self.on_result = on_result
+        self.workers = workers or scheduler.max_in_flight
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.mode = None
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stopping = threading.Event()
+        self._drain = False
+        self._lock = threading.Lock()
+        self._result_lock = threading.Lock()
+        self._pending = {}      # name → (signature, first seen with it) while waiting to settle
+        self._active = set()    # names queued or being processed
+        self._done = {}         # name → signature it was last processed with
+        self._threads = []
+
+    # ---- watching ----
+
+    def _signature(self, name):
+        try:
+            st = os.stat(os.path.join(self.folder, name))
+        except FileNotFoundError:
+            return None, None
+        return (st.st_size, st.st_mtime_ns), st.st_mtime
+
+    def _check(self, names):
+        """Queue every name whose file has settled and was not processed in this state"""
+        now = time.monotonic()
+        for name in names | set(self._pending):
+            signature, mtime = self._signature(name)
+            with self._lock:
+                if signature is None:
+                    self._pending.pop(name, None)
+                    self._done.pop(name, None)
+                    continue
+                if self._done.get(name) == signature:
+                    self._pending.pop(name, None)
+                    continue
+                seen = self._pending.get(name)
+                if seen is None or seen[0] != signature:
+                    self._pending[name] = (signature, now)
+                    continue
+                settled = now - seen[1] >= self.settle or time.time() - mtime >= self.settle
+                if not settled or name in self._active:
+                    continue    # still being written, or wait for the current run of it
+                del self._pending[name]
+                self._active.add(name)
+            self.scheduler.metrics.count("watched_documents")
+            if not self._put((name, signature, time.perf_counter())):
+                return
+
+    def _put(self, item):
+        """Put on the queue, waiting for room; False once stopping"""
+        while not self._stopping.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _scan(self):
+        with os.scandir(self.folder) as entries:
+            return {e.name for e in entries if _is_pdf(e.name) and e.is_file()}
+
+    def _watch(self):
+        inotify = None
+        if self.use_inotify:
+            try:
+                inotify = Inotify(self.folder)
+            except (OSError, AttributeError):
+                inotify = None      # no inotify here: fall back to polling
+        self.mode = "inotify" if inotify else "polling"
+        try:
+            names = self._scan()
+            while not self._stopping.is_set():
+                self._check(names)
+                if inotify is None:
+                    self._stopping.wait(min(self.poll_interval, self.settle / 2) if self._pending
+                                        else self.poll_interval)
+                    names = self._scan()
+                    continue
+                touched = inotify.read(self.settle / 4 if self._pending else 0.5)
+                names = self._scan() if touched is None else {n for n in touched if _is_pdf(n)}
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    # ---- processing ----
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            name, signature, queued = item
+            try:
+                if self._stopping.is_set() and not self._drain:
+                    continue
+                self.scheduler.metrics.observe("queue_wait", time.perf_counter() - queued, name)
+                result = error = None
+                try:
+                    result = self.scheduler.process(self.folder, name, self.parse)
+                except Exception as exc:
+                    self.scheduler.metrics.count("failed_documents")
+                    error = exc
+                # a failed file is not retried until it changes
+                with self._lock:
+                    self._done[name] = signature
+                if self.on_result:
+                    with self._result_lock:
+                        self.on_result(name, result, error)
+            finally:
+                with self._lock:
+                    self._active.discard(name)
+
+    # ---- lifecycle ----
+
+    def start(self):
+        """Start the watcher and worker threads; returns immediately"""
+        self._stopping.clear()
+        self._threads = [threading.Thread(target=self._watch, name="watch-folder", daemon=True)]
+        self._threads += [threading.Thread(target=self._work, name=f"watch-worker-{i}", daemon=True)
+                          for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, drain=False):
+        """Stop watching; running documents finish, queued ones only with drain=True"""
+        self._drain = drain
+        self._stopping.set()
+
+    def join(self, timeout=None):
+        """Wait for the watcher to stop and the workers to finish"""
+        watcher, workers = self._threads[0], self._threads[1:]
+        watcher.join(timeout)
+        for _ in workers:
+            self._queue.put(None)   # after anything still queued, so drain=True empties it first
+        for thread in workers:
+            thread.join(timeout)
+
+    def idle(self):
+        """True when nothing is waiting to settle, queued or being processed"""
+        with self._lock:
+            return not self._pending and not self._active
+
+    def run_forever(self):
+        """start(), then block until SIGINT / SIGTERM and shut down gracefully"""
+        def request_stop(signum, frame):
+            print(f"\n🛑 {signal.Signals(signum).name}: finishing running documents…")
+            self.stop()
+
+        previous = {sig: signal.signal(sig, request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            self.start()
+            print(f"👀 Watching {self.folder} with {self.workers} workers")
+            while not self._stopping.wait(0.5):
+                pass
+            self.join()
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+# -------------------------------
+# LOCAL CHECK: python watch_folder.py --documents 20
+# -------------------------------
+# Copies of a saved document are written into a watched temp folder in two
+# halves with a pause in between, as a slow copy would. Every document
+# should be processed exactly once, only after it is complete; one file is
+# then overwritten and must be processed a second time.
+
+
+if __name__ == "__main__":
+    from local_aws import FakeS3, FakeTextract
+    from metrics import print_summary
+    from scheduler import TextractScheduler
+    from textract_jobs import InMemoryNotifications
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Feed PDFs into a watched folder and process them as they arrive")
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--settle", type=float, default=0.5)
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between new documents")
+    parser.add_argument("--polling", action="store_true", help="do not use inotify")
+    args = parser.parse_args()
+
+    with open(os.path.join(here, "sample.pdf"), "rb") as f:
+        pdf = f.read()
+    folder, results = tempfile.mkdtemp(), tempfile.mkdtemp()
+    processed = []
+    try:
+        def record(name, blocks, error):
+            with open(os.path.join(folder, name), "rb") as f:
+                complete = f.read() == pdf
+            processed.append((name, error is None and complete))
+
+        notifications = InMemoryNotifications()
+        scheduler = TextractScheduler(FakeS3(), FakeTextract(results, polls_before_done=0, notifications=notifications),
+                                      "local", notifications=notifications)
+        watcher = FolderWatcher(scheduler, folder, on_result=record, settle=args.settle,
+                                poll_interval=args.settle / 2, use_inotify=not args.polling).start()
+        started = time.perf_counter()
+        names = [f"doc{n:04d}.pdf" for n in range(args.documents)]
+        for name in names:
+            shutil.copy(os.path.join(here, "pdf_files", "sample.pdf_textract.json"),
+                        os.path.join(results, f"{name}_textract.json"))
+            with open(os.path.join(folder, name), "wb") as f:     # a slow copy: half, pause, rest
+                f.write(pdf[:len(pdf) // 2])
+                f.flush()
+                time.sleep(args.settle / 2)
+                f.write(pdf[len(pdf) // 2:])
+            time.sleep(args.interval)
+        with open(os.path.join(folder, names[0]), "wb") as f:      # overwritten: processed again
+            f.write(pdf)
+        time.sleep(args.settle)   # long enough for the change to be seen
+        while not watcher.idle():
+            time.sleep(0.05)
+        seconds = time.perf_counter() - started
+        watcher.stop()
+        watcher.join()
+    finally:
+        shutil.rmtree(folder)
+        shutil.rmtree(results)
+
+    counts = {name: sum(1 for n, _ in processed if n == name) for name in names}
+    expected = {name: 2 if name == names[0] else 1 for name in names}
+    print(f"mode: {watcher.mode}, {len(processed)} runs in {seconds:.1f}s")
+    print(f"{'✅' if counts == expected else '❌'} each document processed once (the overwritten one twice)")
+    print(f"{'✅' if all(ok for _, ok in processed) else '❌'} no document processed before it was complete")
+    print_summary(scheduler.metrics)